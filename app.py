@@ -1,9 +1,10 @@
+import math
 import streamlit as st
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import os
 from config import Config
-from search_engines import search_manager
-from qwen_client import qwen_client
+from translation_cache import translation_cache
 from download_manager import download_manager
 from download_history import download_history
 from search_history import search_history
@@ -17,53 +18,26 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def load_css():
+    """读取样式表（每个进程只读取一次文件）"""
+    css_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'style.css')
+    with open(css_file, 'r', encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+
 # 自定义CSS
-st.markdown("""
-<style>
-    .paper-card {
-        padding: 20px;
-        border-radius: 10px;
-        border: 1px solid #ddd;
-        margin-bottom: 20px;
-        background-color: #f9f9f9;
-    }
-    .paper-title {
-        font-size: 18px;
-        font-weight: bold;
-        color: #1f77b4;
-        margin-bottom: 10px;
-    }
-    .paper-meta {
-        font-size: 14px;
-        color: #666;
-        margin-bottom: 10px;
-    }
-    .paper-abstract {
-        font-size: 14px;
-        line-height: 1.6;
-        margin-top: 10px;
-    }
-    .translation {
-        background-color: #f0f8ff;
-        color: #2c3e50;
-        padding: 12px;
-        border-radius: 8px;
-        margin-top: 10px;
-        border-left: 4px solid #3498db;
-        font-size: 14px;
-        line-height: 1.6;
-    }
-    .translation strong {
-        color: #2980b9;
-    }
-</style>
-""", unsafe_allow_html=True)
+# Streamlit会移除本次运行中未重新输出的元素，因此样式需在每次整页运行时注入；
+# 卡片fragment的局部重跑不会重复发送
+st.markdown(load_css(), unsafe_allow_html=True)
 
 
 def init_session_state():
     """初始化session state"""
     if 'search_results' not in st.session_state:
         st.session_state.search_results = []
+    if 'search_results_dicts' not in st.session_state:
+        st.session_state.search_results_dicts = []
     if 'selected_papers' not in st.session_state:
         st.session_state.selected_papers = set()
     if 'translations' not in st.session_state:
@@ -81,20 +55,70 @@ def validate_config():
         return False
 
 
+@st.cache_data(ttl=30, show_spinner=False)
+def get_last_search():
+    """获取最后一次搜索记录（短时缓存，搜索历史变化时清除）"""
+    return search_history.get_last_search()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_popular_excludes(limit):
+    """获取常用排除词（短时缓存，搜索历史变化时清除）"""
+    return search_history.get_popular_excludes(limit)
+
+
+def clear_search_history_cache():
+    """搜索历史变化后清除相关缓存"""
+    get_last_search.clear()
+    get_popular_excludes.clear()
+
+
+def parse_keyword_lines(raw_text, state_key):
+    """
+    解析每行一个的关键词文本，文本未变化时直接复用上次的解析结果
+    
+    Args:
+        raw_text: 文本框中的原始文本
+        state_key: 在session state中保存解析结果的键
+        
+    Returns:
+        关键词列表
+    """
+    cached = st.session_state.get(state_key)
+    if cached is None or cached[0] != raw_text:
+        cached = (raw_text, [k.strip() for k in raw_text.split('\n') if k.strip()])
+        st.session_state[state_key] = cached
+    return cached[1]
+
+
 def perform_search(keywords, start_date, end_date, sources):
-    """执行搜索"""
+    """执行搜索（各搜索引擎自行缓存完整的结果，失败的来源不会被缓存）"""
+    # 延迟导入：搜索引擎依赖lxml、selenium等较重的包，只在真正搜索时加载
+    from search_engines import search_manager
+    
+    errors = {}
     with st.spinner('🔍 正在搜索文献...'):
         results = search_manager.search_all(
             keywords=keywords,
             start_date=start_date.strftime('%Y-%m-%d') if start_date else None,
             end_date=end_date.strftime('%Y-%m-%d') if end_date else None,
-            sources=sources,
+            sources=list(sources),
             exclude_keywords=Config.EXCLUDE_KEYWORDS if Config.ENABLE_SMART_FILTER else None,
-            require_keywords=Config.REQUIRE_KEYWORDS if Config.ENABLE_SMART_FILTER else None
+            require_keywords=Config.REQUIRE_KEYWORDS if Config.ENABLE_SMART_FILTER else None,
+            errors=errors
         )
+        paper_dicts = [paper.to_dict() for paper in results]
+        
+        # 预先计算唯一标识和标准化标题，后续重跑直接复用
+        for idx, paper_dict in enumerate(paper_dicts):
+            paper_dict['_id'] = f"{idx}_{paper_dict['title'][:50]}"
+            paper_dict['_norm_title'] = download_history.normalize_title(paper_dict['title'])
         st.session_state.search_results = results
+        # 字典形式只在结果到达时生成一次，供每次重跑时的渲染、翻译、下载直接使用
+        st.session_state.search_results_dicts = paper_dicts
         st.session_state.selected_papers = set()
         st.session_state.translations = {}
+        st.session_state.results_page = 1
         
         # 保存搜索历史
         exclude_keywords_str = ', '.join(Config.EXCLUDE_KEYWORDS) if Config.ENABLE_SMART_FILTER else ""
@@ -104,16 +128,30 @@ def perform_search(keywords, start_date, end_date, sources):
             sources=sources,
             results_count=len(results)
         )
+        clear_search_history_cache()
+    
+    if errors:
+        failed = '；'.join(f"{source}: {message}" for source, message in errors.items())
+        st.warning(f"⚠️ 部分数据源搜索失败，结果可能不完整（{failed}）")
     return results
 
 
 def translate_text(text, cache_key, auto=False):
     """翻译文本（带缓存）"""
+    from qwen_client import qwen_client
+    
     if cache_key not in st.session_state.translations:
-        if not auto:
-            with st.spinner('🌐 正在翻译...'):
-                translation = qwen_client.translate_to_chinese(text)
-                st.session_state.translations[cache_key] = translation
+        # 优先使用磁盘缓存中的历史翻译
+        translation = translation_cache.get(text)
+        if translation:
+            st.session_state.translations[cache_key] = translation
+        elif not auto:
+            # 手动翻译：流式显示译文，不必等待完整响应
+            translation = st.write_stream(qwen_client.translate_stream(text))
+            if not isinstance(translation, str):
+                translation = ''.join(str(part) for part in translation)
+            translation = translation.strip() or None
+            st.session_state.translations[cache_key] = translation
         else:
             # 自动翻译（后台静默翻译）
             translation = qwen_client.translate_to_chinese(text)
@@ -121,48 +159,83 @@ def translate_text(text, cache_key, auto=False):
     return st.session_state.translations.get(cache_key)
 
 
-def auto_translate_papers(papers):
+def auto_translate_papers(paper_dicts):
     """自动翻译论文标题和摘要"""
     if not Config.AUTO_TRANSLATE:
         return
     
+    # 先收集所有尚未翻译的 (缓存键, 文本)，再分批合并请求
+    pending = []
+    for paper_dict in paper_dicts:
+        # 标题和摘要（摘要较长可能消耗较多配额）
+        for field in ('title', 'abstract'):
+            cache_key = f"{field}_{paper_dict['_id']}"
+            if cache_key in st.session_state.translations:
+                continue
+            cached = translation_cache.get(paper_dict[field])
+            if cached:
+                st.session_state.translations[cache_key] = cached
+            else:
+                pending.append((cache_key, paper_dict[field]))
+    
+    if not pending:
+        return
+    
+    from qwen_client import qwen_client
+    
     progress_text = st.empty()
     progress_bar = st.progress(0)
     
-    total = len(papers)
-    for idx, paper in enumerate(papers):
-        paper_dict = paper.to_dict()
-        paper_id_base = f"{idx}_{paper_dict['title'][:50]}"
-        
-        # 翻译标题
-        title_key = f"title_{paper_id_base}"
-        if title_key not in st.session_state.translations:
-            translate_text(paper_dict['title'], title_key, auto=True)
-        
-        # 翻译摘要（可选，摘要较长可能消耗较多配额）
-        abstract_key = f"abstract_{paper_id_base}"
-        if abstract_key not in st.session_state.translations:
-            translate_text(paper_dict['abstract'], abstract_key, auto=True)
-        
-        # 更新进度
-        progress = (idx + 1) / total
-        progress_bar.progress(progress)
-        progress_text.text(f"正在翻译论文 {idx + 1}/{total}...")
+    total = len(pending)
+    batch_size = max(1, Config.TRANSLATE_BATCH_SIZE)
+    chunks = [pending[start:start + batch_size] for start in range(0, total, batch_size)]
+    
+    # 各批次并发请求，在主线程中写回结果并更新进度
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, Config.TRANSLATE_CONCURRENCY)) as executor:
+        futures = {
+            executor.submit(qwen_client.translate_batch, [text for _, text in chunk]): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            translations = future.result()
+            for (cache_key, _), translation in zip(chunk, translations):
+                st.session_state.translations[cache_key] = translation
+            
+            # 更新进度
+            done += len(chunk)
+            progress_bar.progress(done / total)
+            progress_text.text(f"正在翻译 {done}/{total} 段文本...")
     
     progress_bar.empty()
     progress_text.empty()
 
 
-def display_paper(paper, index):
-    """显示单篇论文"""
-    paper_dict = paper.to_dict()
+def reset_selection_checkboxes():
+    """丢弃各论文勾选框保存的状态，重跑时按 selected_papers 重新初始化（全选/取消全选后调用）"""
+    for paper_dict in st.session_state.search_results_dicts:
+        st.session_state.pop(f"select_{paper_dict['_id']}", None)
+
+
+@st.fragment
+def display_paper(paper_dict, index, downloaded_map):
+    """
+    显示单篇论文
     
-    # 创建唯一标识
-    paper_id = f"{index}_{paper_dict['title'][:50]}"
+    以fragment方式渲染：勾选、翻译等卡片内的交互只重跑当前卡片，不重跑整个页面。
+    
+    Args:
+        paper_dict: 论文字典（来自 st.session_state.search_results_dicts）
+        index: 论文在结果列表中的序号
+        downloaded_map: download_history.lookup_keys 返回的 标题键->下载信息 映射
+    """
+    # 唯一标识
+    paper_id = paper_dict['_id']
     
     # 检查是否已下载
-    is_downloaded = download_history.is_downloaded(paper_dict['title'])
-    download_info = download_history.get_download_info(paper_dict['title']) if is_downloaded else None
+    download_info = downloaded_map.get(paper_dict['_norm_title'])
+    is_downloaded = download_info is not None
     
     # 勾选框
     col1, col2 = st.columns([0.05, 0.95])
@@ -183,10 +256,14 @@ def display_paper(paper, index):
                 value=paper_id in st.session_state.selected_papers,
                 label_visibility="collapsed"
             )
-            if is_selected:
-                st.session_state.selected_papers.add(paper_id)
-            elif paper_id in st.session_state.selected_papers:
-                st.session_state.selected_papers.remove(paper_id)
+            selected = st.session_state.selected_papers
+            if is_selected != (paper_id in selected):
+                if is_selected:
+                    selected.add(paper_id)
+                else:
+                    selected.discard(paper_id)
+                # 已选数量显示在fragment之外，勾选变化时重跑整个页面以更新计数
+                st.rerun(scope="app")
     
     with col2:
         # 标题（英文）+ 已下载标记
@@ -209,7 +286,7 @@ def display_paper(paper, index):
             if st.button("🌐 翻译标题", key=f"trans_title_btn_{paper_id}"):
                 translation = translate_text(paper_dict['title'], title_key, auto=False)
                 if translation:
-                    st.rerun()
+                    st.rerun(scope="fragment")
         
         # 元信息
         meta_info = []
@@ -252,7 +329,7 @@ def display_paper(paper, index):
                 if st.button("🌐 翻译摘要", key=f"trans_abs_btn_{paper_id}"):
                     translation = translate_text(paper_dict['abstract'], abstract_key, auto=False)
                     if translation:
-                        st.rerun()
+                        st.rerun(scope="fragment")
         
         st.divider()
     
@@ -275,9 +352,9 @@ def download_selected_papers():
             continue
     
     papers_to_download = [
-        st.session_state.search_results[idx].to_dict() 
+        st.session_state.search_results_dicts[idx]
         for idx in selected_indices 
-        if idx < len(st.session_state.search_results)
+        if idx < len(st.session_state.search_results_dicts)
     ]
     
     # 过滤掉没有PDF链接的论文
@@ -294,7 +371,7 @@ def download_selected_papers():
     def update_progress(current, total):
         progress = (current + 1) / total
         progress_bar.progress(progress)
-        status_text.text(f"正在下载: {current + 1}/{total}")
+        status_text.text(f"已完成: {current + 1}/{total}")
     
     # 执行下载
     results = download_manager.download_multiple(
@@ -335,6 +412,10 @@ def main():
     # 初始化
     init_session_state()
     
+    # 侧边栏多处用到的历史数据，每次运行只读取一次
+    total_downloads = download_history.get_total_downloads()
+    recent_searches = search_history.get_recent_searches(20)
+    
     # 标题
     st.title("📚 学术文献检索Agent")
     st.markdown("基于Qwen API的智能文献检索和下载工具")
@@ -348,7 +429,7 @@ def main():
         st.header("🔧 搜索设置")
         
         # 搜索历史快捷选择
-        last_search = search_history.get_last_search()
+        last_search = get_last_search()
         if last_search:
             with st.expander("📜 搜索历史", expanded=False):
                 st.caption("点击快速填充上次搜索")
@@ -358,7 +439,7 @@ def main():
                     st.rerun()
                 
                 # 显示最近5次搜索
-                recent = search_history.get_recent_searches(5)
+                recent = recent_searches[:5]
                 if len(recent) > 1:
                     st.caption("最近搜索:")
                     for idx, record in enumerate(recent[1:], 1):
@@ -375,6 +456,7 @@ def main():
                         with col2:
                             if st.button("🗑️", key=f"del_{idx}", help="删除"):
                                 search_history.remove_search(idx)
+                                clear_search_history_cache()
                                 st.rerun()
         
         # 关键词输入
@@ -430,7 +512,7 @@ def main():
             
             if enable_filter:
                 # 快捷填充常用排除词
-                popular_excludes = search_history.get_popular_excludes(3)
+                popular_excludes = get_popular_excludes(3)
                 if popular_excludes:
                     st.caption("常用排除词:")
                     cols = st.columns(len(popular_excludes))
@@ -449,7 +531,7 @@ def main():
                     help="论文标题或摘要中包含这些词的会被过滤掉",
                     label_visibility="collapsed"
                 )
-                Config.EXCLUDE_KEYWORDS = [k.strip() for k in exclude_text.split('\n') if k.strip()]
+                Config.EXCLUDE_KEYWORDS = parse_keyword_lines(exclude_text, '_exclude_parsed')
                 
                 # 清除加载的排除词
                 if 'load_exclude' in st.session_state:
@@ -463,7 +545,7 @@ def main():
                     help="论文必须包含至少一个这些关键词",
                     label_visibility="collapsed"
                 )
-                Config.REQUIRE_KEYWORDS = [k.strip() for k in require_text.split('\n') if k.strip()]
+                Config.REQUIRE_KEYWORDS = parse_keyword_lines(require_text, '_require_parsed')
                 
                 # 显示当前过滤设置
                 if Config.EXCLUDE_KEYWORDS or Config.REQUIRE_KEYWORDS:
@@ -504,7 +586,6 @@ def main():
         
         # 下载历史管理
         st.subheader("📊 下载历史")
-        total_downloads = download_history.get_total_downloads()
         st.write(f"累计下载: **{total_downloads}** 篇论文")
         
         if total_downloads > 0:
@@ -515,18 +596,19 @@ def main():
         
         # 搜索历史管理
         st.subheader("📜 搜索历史管理")
-        total_searches = len(search_history.get_recent_searches())
+        total_searches = len(recent_searches[:10])
         st.write(f"历史搜索: **{total_searches}** 条")
         
         if total_searches > 0:
             if st.button("🗑️ 清空搜索历史", use_container_width=True):
                 search_history.clear_history()
+                clear_search_history_cache()
                 st.success("搜索历史已清空")
                 st.rerun()
             
             # 查看完整历史
             with st.expander("查看完整历史"):
-                for idx, record in enumerate(search_history.get_recent_searches(20)):
+                for idx, record in enumerate(recent_searches):
                     st.markdown(f"""
                     **{idx+1}. {record['keywords']}**  
                     排除词: {record.get('exclude_keywords', '无')}  
@@ -553,7 +635,7 @@ def main():
                 # 自动翻译所有论文
                 if Config.AUTO_TRANSLATE:
                     with st.spinner('🌐 正在自动翻译论文...'):
-                        auto_translate_papers(results)
+                        auto_translate_papers(st.session_state.search_results_dicts)
                     st.success("✨ 翻译完成！")
             else:
                 st.info("ℹ️ 未找到相关论文，请尝试其他关键词")
@@ -574,22 +656,40 @@ def main():
         col1, col2, col3 = st.columns([1, 1, 4])
         with col1:
             if st.button("✅ 全选"):
-                for idx, paper in enumerate(st.session_state.search_results):
-                    paper_dict = paper.to_dict()
-                    paper_id = f"{idx}_{paper_dict['title'][:50]}"
-                    st.session_state.selected_papers.add(paper_id)
+                st.session_state.selected_papers.update(
+                    paper_dict['_id'] for paper_dict in st.session_state.search_results_dicts
+                )
+                reset_selection_checkboxes()
                 st.rerun()
         
         with col2:
             if st.button("❌ 取消全选"):
                 st.session_state.selected_papers.clear()
+                reset_selection_checkboxes()
                 st.rerun()
         
         st.markdown(f"**已选择: {len(st.session_state.selected_papers)} 篇论文**")
         
-        # 显示每篇论文
-        for idx, paper in enumerate(st.session_state.search_results):
-            display_paper(paper, idx)
+        # 分页显示，每次重跑只渲染当前页的论文
+        paper_dicts = st.session_state.search_results_dicts
+        page_size = max(1, Config.PAGE_SIZE)
+        total_pages = max(1, math.ceil(len(paper_dicts) / page_size))
+        page = st.number_input(
+            f"页码（共 {total_pages} 页，每页 {page_size} 篇）",
+            min_value=1,
+            max_value=total_pages,
+            step=1,
+            key="results_page"
+        )
+        start = (page - 1) * page_size
+        page_dicts = paper_dicts[start:start + page_size]
+        
+        # 当前页的下载状态一次性批量查询
+        downloaded_map = download_history.lookup_keys(
+            [paper_dict['_norm_title'] for paper_dict in page_dicts]
+        )
+        for idx, paper_dict in enumerate(page_dicts, start):
+            display_paper(paper_dict, idx, downloaded_map)
         
         # 下载按钮
         st.markdown("---")
@@ -15,9 +15,16 @@ class Config:
     
     # 翻译配置
     AUTO_TRANSLATE = False  # 是否自动翻译标题和摘要
+    TRANSLATE_BATCH_SIZE = 20  # 每次API请求合并翻译的文本段数
+    TRANSLATE_CONCURRENCY = 8  # 并发翻译请求数
+    QWEN_RATE_LIMIT = 5  # 每秒最多发起的Qwen API请求数
     
     # 搜索配置
     MAX_RESULTS = 100  # 每次搜索最大结果数
+    PAGE_SIZE = 20  # 搜索结果每页显示的论文数
+    SEARCH_CACHE_TTL = 24 * 3600  # 各搜索引擎结果的磁盘缓存有效期（秒，各来源索引每天更新），0表示不使用缓存
+    # Google Scholar是否使用无头浏览器（同时屏蔽图片、样式和字体；无法手动完成验证码）
+    SELENIUM_HEADLESS = os.getenv('SELENIUM_HEADLESS', 'false').lower() == 'true'
     
     # 智能过滤配置
     ENABLE_SMART_FILTER = True  # 是否启用智能过滤
@@ -25,6 +32,7 @@ class Config:
     REQUIRE_KEYWORDS = []  # 必需关键词列表（至少包含一个的论文才会保留）
     
     # 下载配置
+    MAX_DOWNLOAD_WORKERS = 16  # 批量下载时的并发数
     date_suffix = datetime.now().strftime('%Y%m%d')
     DEFAULT_DOWNLOAD_PATH = os.path.join(os.path.expanduser('~'), 'Downloads', f'papers_{date_suffix}')
     
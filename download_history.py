@@ -1,49 +1,102 @@
 import os
-import json
+import re
+import functools
+from contextlib import contextmanager
+import sqlite3
+import threading
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
+import json_utils
+
+
+# 连续的空白字符
+_WS_RE = re.compile(r'\s+')
+
+# downloads表中除key以外的字段，与下载信息字典的键一致
+_INFO_FIELDS = ('title', 'file_path', 'pdf_url', 'download_date', 'date_only')
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_title(title: str) -> str:
+    """转小写并合并多余空白（同一标题在每次重跑中会被反复标准化，结果做缓存）"""
+    return _WS_RE.sub(' ', title.lower()).strip()
 
 
 class DownloadHistory:
-    """下载历史管理"""
+    """下载历史管理（SQLite存储）"""
     
     def __init__(self, history_file: str = None):
         """
         初始化下载历史管理器
         
         Args:
-            history_file: 历史记录文件路径
+            history_file: 历史记录数据库文件路径
         """
         if history_file is None:
             # 默认保存在项目根目录
             project_root = os.path.dirname(os.path.abspath(__file__))
             history_file = os.path.join(
-                project_root, 
-                'paper_search_history.json'
+                project_root,
+                'paper_search_history.db'
             )
         
         self.history_file = history_file
-        self.history = self._load_history()
+        self.lock = threading.RLock()
+        self.conn = self._connect()
+        self._migrate_json_history(os.path.splitext(history_file)[0] + '.json')
+        # 已下载标题键的内存索引，is_downloaded 无需查询数据库
+        self.keys = self._load_keys()
+        # 批次中尚未写入数据库的记录（键 -> 数据行），查询时与数据库中的记录合并
+        self.pending = {}
     
-    def _load_history(self) -> Dict:
-        """加载历史记录"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载历史记录失败: {e}")
-                return {}
-        return {}
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库并创建表"""
+        conn = sqlite3.connect(self.history_file, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+        except sqlite3.DatabaseError as e:
+            print(f"启用WAL模式失败: {e}")
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS downloads ('
+            'key TEXT PRIMARY KEY, title TEXT, file_path TEXT, pdf_url TEXT, '
+            'download_date TEXT, date_only TEXT)'
+        )
+        return conn
     
-    def _save_history(self):
-        """保存历史记录"""
+    def _migrate_json_history(self, json_file: str):
+        """将旧版JSON历史记录导入数据库（仅在数据库为空时执行一次）"""
+        if not os.path.exists(json_file) or self.get_total_downloads() > 0:
+            return
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            with open(json_file, 'rb') as f:
+                history = json_utils.loads(f.read())
+            with self.lock:
+                self.conn.execute('BEGIN')
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?)',
+                    [
+                        (key, info.get('title'), info.get('file_path'), info.get('pdf_url'),
+                         info.get('download_date'), info.get('date_only'))
+                        for key, info in history.items()
+                    ]
+                )
+                self.conn.execute('COMMIT')
+            print(f"已从 {json_file} 导入 {len(history)} 条下载记录")
         except Exception as e:
-            print(f"保存历史记录失败: {e}")
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+            print(f"导入旧版历史记录失败: {e}")
+    
+    def _load_keys(self) -> set:
+        """加载所有已下载论文的键"""
+        try:
+            with self.lock:
+                return {row['key'] for row in self.conn.execute('SELECT key FROM downloads')}
+        except Exception as e:
+            print(f"加载历史记录失败: {e}")
+            return set()
     
     def is_downloaded(self, paper_title: str, pdf_url: str = None) -> bool:
         """
@@ -52,13 +105,13 @@ class DownloadHistory:
         Args:
             paper_title: 论文标题
             pdf_url: PDF链接（可选，用于更精确匹配）
-            
+        
         Returns:
             是否已下载
         """
         # 使用标题作为主键
-        key = self._normalize_title(paper_title)
-        return key in self.history
+        key = self.normalize_title(paper_title)
+        return key in self.keys
     
     def get_download_info(self, paper_title: str) -> Optional[Dict]:
         """
@@ -66,12 +119,57 @@ class DownloadHistory:
         
         Args:
             paper_title: 论文标题
-            
+        
         Returns:
             下载信息字典，包含日期和路径
         """
-        key = self._normalize_title(paper_title)
-        return self.history.get(key)
+        key = self.normalize_title(paper_title)
+        if key not in self.keys:
+            return None
+        with self.lock:
+            pending = self.pending.get(key)
+            if pending is not None:
+                return dict(zip(_INFO_FIELDS, pending[1:]))
+            row = self.conn.execute(
+                'SELECT title, file_path, pdf_url, download_date, date_only '
+                'FROM downloads WHERE key = ? LIMIT 1',
+                (key,)
+            ).fetchone()
+        return dict(row) if row else None
+    
+    def lookup_keys(self, keys: List[str]) -> Dict[str, Optional[Dict]]:
+        """
+        按已标准化的标题键批量查询下载信息
+        
+        Args:
+            keys: normalize_title 生成的标题键列表
+        
+        Returns:
+            以标题键为键的字典，未下载的论文对应None
+        """
+        infos = dict.fromkeys(keys)
+        downloaded = [key for key in infos if key in self.keys]
+        
+        with self.lock:
+            # 分批查询，避免超过SQLite的参数数量上限
+            for start in range(0, len(downloaded), 500):
+                batch = downloaded[start:start + 500]
+                rows = self.conn.execute(
+                    'SELECT key, title, file_path, pdf_url, download_date, date_only '
+                    f'FROM downloads WHERE key IN ({",".join("?" * len(batch))})',
+                    batch
+                )
+                for row in rows:
+                    info = dict(row)
+                    infos[info.pop('key')] = info
+            
+            # 批次中尚未写入的记录比数据库中的更新
+            for key in downloaded:
+                pending = self.pending.get(key)
+                if pending is not None:
+                    infos[key] = dict(zip(_INFO_FIELDS, pending[1:]))
+        
+        return infos
     
     def add_download(self, paper_title: str, file_path: str, pdf_url: str = None):
         """
@@ -82,15 +180,37 @@ class DownloadHistory:
             file_path: 文件保存路径
             pdf_url: PDF链接
         """
-        key = self._normalize_title(paper_title)
-        self.history[key] = {
-            'title': paper_title,
-            'file_path': file_path,
-            'pdf_url': pdf_url,
-            'download_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'date_only': datetime.now().strftime('%Y-%m-%d')
-        }
-        self._save_history()
+        row = self._make_row(paper_title, file_path, pdf_url)
+        try:
+            with self.lock:
+                self.conn.execute('INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?)', row)
+                self.keys.add(row[0])
+        except Exception as e:
+            print(f"保存历史记录失败: {e}")
+    
+    def _make_row(self, paper_title: str, file_path: str, pdf_url: Optional[str]) -> tuple:
+        """生成downloads表的一行（键, 标题, 路径, 链接, 下载时间, 下载日期）"""
+        now = datetime.now()
+        return (self.normalize_title(paper_title), paper_title, file_path, pdf_url,
+                now.strftime('%Y-%m-%d %H:%M:%S'), now.strftime('%Y-%m-%d'))
+    
+    @contextmanager
+    def begin_batch(self):
+        """
+        批量写入：通过返回的批次对象添加的记录先暂存在内存中，退出时在一个事务中统一写入
+        
+        批次不在共享连接上开启长事务，其他会话的写入照常立即提交，不会被并入本批次
+        
+        用法:
+            with download_history.begin_batch() as batch:
+                batch.add_download(...)
+        """
+        batch = DownloadBatch(self)
+        try:
+            yield batch
+        finally:
+            # 出错时同样提交，已下载成功的文件需要保留记录
+            batch.commit()
     
     def remove_download(self, paper_title: str):
         """
@@ -99,32 +219,87 @@ class DownloadHistory:
         Args:
             paper_title: 论文标题
         """
-        key = self._normalize_title(paper_title)
-        if key in self.history:
-            del self.history[key]
-            self._save_history()
+        key = self.normalize_title(paper_title)
+        if key in self.keys:
+            with self.lock:
+                self.conn.execute('DELETE FROM downloads WHERE key = ?', (key,))
+                self.keys.discard(key)
+                self.pending.pop(key, None)
     
-    def _normalize_title(self, title: str) -> str:
+    def normalize_title(self, title: str) -> str:
         """
         标准化标题作为键
         
         Args:
             title: 原始标题
-            
+        
         Returns:
             标准化后的标题
         """
-        # 转小写，去除多余空格
-        return ' '.join(title.lower().strip().split())
+        return _normalize_title(title)
     
     def clear_history(self):
         """清空历史记录"""
-        self.history = {}
-        self._save_history()
+        with self.lock:
+            self.conn.execute('DELETE FROM downloads')
+            self.keys = set()
+            self.pending = {}
     
     def get_total_downloads(self) -> int:
         """获取总下载数"""
-        return len(self.history)
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM downloads').fetchone()[0]
+
+
+class DownloadBatch:
+    """一批下载记录：添加后立即计入已下载索引，commit时在一个短事务中写入数据库"""
+    
+    def __init__(self, history: DownloadHistory):
+        """
+        Args:
+            history: 所属的下载历史管理器
+        """
+        self.history = history
+        self.rows = []
+    
+    def add_download(self, paper_title: str, file_path: str, pdf_url: str = None):
+        """
+        添加下载记录（参数同 DownloadHistory.add_download）
+        
+        Args:
+            paper_title: 论文标题
+            file_path: 文件保存路径
+            pdf_url: PDF链接
+        """
+        row = self.history._make_row(paper_title, file_path, pdf_url)
+        history = self.history
+        with history.lock:
+            self.rows.append(row)
+            history.pending[row[0]] = row
+            history.keys.add(row[0])
+    
+    def commit(self):
+        """将暂存的记录写入数据库（持有历史记录的锁，其他写入在事务结束后再执行）"""
+        history = self.history
+        with history.lock:
+            # 暂存期间被删除或清空的记录不再写入
+            rows = [row for row in self.rows if history.pending.get(row[0]) is row]
+            self.rows = []
+            if not rows:
+                return
+            try:
+                history.conn.execute('BEGIN')
+                history.conn.executemany('INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?, ?)', rows)
+                history.conn.execute('COMMIT')
+            except Exception as e:
+                if history.conn.in_transaction:
+                    history.conn.execute('ROLLBACK')
+                print(f"保存历史记录失败: {e}")
+                for row in rows:
+                    history.keys.discard(row[0])
+            finally:
+                for row in rows:
+                    history.pending.pop(row[0], None)
 
 
 # 创建全局下载历史实例
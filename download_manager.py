@@ -1,9 +1,22 @@
 import os
+import shutil
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Optional
 from pathlib import Path
 import re
 from download_history import download_history
+from http_session import session
+
+
+# 文件名中的非法字符
+_INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+# 带进度回调时每次读取的块大小
+_CHUNK_SIZE = 128 * 1024
+# 无进度回调时直接复制原始流的缓冲区大小
+_COPY_BUFFER_SIZE = 1024 * 1024
 
 
 class DownloadManager:
@@ -25,6 +38,13 @@ class DownloadManager:
         # 确保下载目录存在
         Path(self.download_path).mkdir(parents=True, exist_ok=True)
         
+        # 并发下载时保护文件名分配和正在下载的标题集合
+        self._lock = threading.Lock()
+        self._downloading = set()
+        
+        # 所有下载线程共用同一个连接池
+        self.session = session
+        
     def sanitize_filename(self, filename: str) -> str:
         """
         清理文件名，移除非法字符
@@ -35,14 +55,111 @@ class DownloadManager:
         Returns:
             清理后的文件名
         """
-        # 移除非法字符
-        filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-        # 限制文件名长度
-        if len(filename) > 200:
-            filename = filename[:200]
-        return filename.strip()
+        # 移除非法字符并限制文件名长度
+        return _INVALID_FILENAME_CHARS.sub('', filename)[:200].strip()
+    
+    def _reserve_filepath(self, title: str) -> str:
+        """
+        生成不重复的文件路径，并立即创建文件占位（线程安全）
+        
+        Args:
+            title: 论文标题
+            
+        Returns:
+            文件路径
+        """
+        base = self.sanitize_filename(title)
+        filepath = os.path.join(self.download_path, base + ".pdf")
+        
+        # 以独占方式创建文件，已存在时添加序号（创建与检查是原子操作，无需加锁）
+        counter = 1
+        while True:
+            try:
+                os.close(os.open(filepath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return filepath
+            except FileExistsError:
+                filepath = os.path.join(self.download_path, f"{base}_{counter}.pdf")
+                counter += 1
     
-    def download_pdf(self, url: str, title: str, progress_callback=None) -> tuple[bool, str, str]:
+    def _copy_to_file(self, response, f):
+        """
+        将响应正文直接写入文件
+        
+        未压缩的响应从底层连接 readinto 到复用的缓冲区，不为每块数据创建bytes对象；
+        其他情况回退为 shutil.copyfileobj。
+        
+        Args:
+            response: 以stream=True发起的响应
+            f: 以二进制写模式打开的文件
+        """
+        raw = response.raw
+        if not response.headers.get('content-encoding'):
+            # urllib3底层的http.client响应对象（私有属性，不同版本可能不存在）
+            fp = getattr(raw, '_fp', None)
+            if fp is not None and hasattr(fp, 'readinto'):
+                buffer = bytearray(_COPY_BUFFER_SIZE)
+                view = memoryview(buffer)
+                while True:
+                    n = fp.readinto(buffer)
+                    if not n:
+                        break
+                    f.write(view[:n])
+                # 绕过了urllib3的读取，需手动将连接归还连接池
+                raw.release_conn()
+                return
+        
+        # 仅在服务器仍返回压缩内容时才解压
+        raw.decode_content = bool(response.headers.get('content-encoding'))
+        shutil.copyfileobj(raw, f, length=_COPY_BUFFER_SIZE)
+    
+    def _write_file(self, response, filepath: str, progress_callback=None):
+        """
+        将响应正文写入已预留的文件
+        
+        Args:
+            response: 以stream=True发起的响应
+            filepath: _reserve_filepath 预留的文件路径
+            progress_callback: 进度回调函数
+            
+        Raises:
+            requests.RequestException: 传输中断或超时（文件内容不完整）
+        """
+        total_size = int(response.headers.get('content-length', 0))
+        downloaded_size = 0
+        
+        with open(filepath, 'wb') as f:
+            # 已知文件大小时预分配空间，减少磁盘碎片
+            if total_size > 0:
+                f.truncate(total_size)
+            
+            if progress_callback is None:
+                # 无需进度时直接复制原始流，避免逐块的Python循环
+                self._copy_to_file(response, f)
+            else:
+                last_reported = 0
+                for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                    if chunk:
+                        f.write(chunk)
+                        downloaded_size += len(chunk)
+                        
+                        # 调用进度回调（进度每增加1%才回调一次）
+                        if total_size > 0:
+                            progress = (downloaded_size / total_size) * 100
+                            if int(progress) > last_reported:
+                                last_reported = int(progress)
+                                progress_callback(progress)
+            
+            # 未压缩传输时写入量必须等于Content-Length；直接读取底层连接时连接中断不会报错，需在此检查
+            if total_size > 0 and not response.headers.get('content-encoding') and f.tell() < total_size:
+                raise requests.exceptions.ChunkedEncodingError(
+                    f"连接中断：已接收 {f.tell()}/{total_size} 字节"
+                )
+            
+            # 实际写入量可能与Content-Length不同（如经过压缩传输），按实际大小截断
+            f.truncate(f.tell())
+    
+    def download_pdf(self, url: str, title: str, progress_callback=None,
+                     batch=None) -> tuple[bool, str, str]:
         """
         下载单个PDF文件
         
@@ -50,6 +167,7 @@ class DownloadManager:
             url: PDF的URL
             title: 论文标题，用作文件名
             progress_callback: 进度回调函数
+            batch: download_history.begin_batch() 返回的批次，None表示立即写入下载历史
             
         Returns:
             (是否成功, 消息, 文件路径)
@@ -57,54 +175,56 @@ class DownloadManager:
         if not url:
             return False, "PDF链接不可用", ""
         
-        # 检查是否已下载
-        if download_history.is_downloaded(title):
-            info = download_history.get_download_info(title)
-            return False, f"已下载过 (日期: {info['date_only']})", info.get('file_path', '')
+        # 检查是否已下载，或同一标题正由其他线程下载
+        key = download_history.normalize_title(title)
+        with self._lock:
+            if download_history.is_downloaded(title):
+                info = download_history.get_download_info(title)
+                return False, f"已下载过 (日期: {info['date_only']})", info.get('file_path', '')
+            if key in self._downloading:
+                return False, "已下载过 (与本批次中的其他论文重复)", ""
+            self._downloading.add(key)
             
         try:
-            # 生成文件名
-            filename = self.sanitize_filename(title) + ".pdf"
-            filepath = os.path.join(self.download_path, filename)
-            
-            # 如果文件已存在，添加序号
-            counter = 1
-            original_filepath = filepath
-            while os.path.exists(filepath):
-                filename = self.sanitize_filename(title) + f"_{counter}.pdf"
-                filepath = os.path.join(self.download_path, filename)
-                counter += 1
-            
             # 下载文件
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+                # PDF本身已压缩，要求服务器不再做gzip传输，写入时无需解压
+                'Accept-Encoding': 'identity'
             }
             
-            response = requests.get(url, headers=headers, stream=True, timeout=60)
-            response.raise_for_status()
+            # 链接中不含pdf时先用HEAD确认类型，非PDF页面无需下载正文
+            is_pdf_url = 'pdf' in url.lower()
+            if not is_pdf_url:
+                head = self.session.head(url, headers=headers, allow_redirects=True, timeout=10)
+                # 部分服务器不支持HEAD，此时仍以GET响应头为准
+                if head.ok and 'application/pdf' not in head.headers.get('content-type', ''):
+                    return False, "链接不是有效的PDF文件", ""
             
-            # 检查是否是PDF
-            content_type = response.headers.get('content-type', '')
-            if 'application/pdf' not in content_type and 'pdf' not in url.lower():
-                return False, "链接不是有效的PDF文件", ""
-            
-            # 写入文件
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
-            
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        # 调用进度回调
-                        if progress_callback and total_size > 0:
-                            progress = (downloaded_size / total_size) * 100
-                            progress_callback(progress)
+            response = self.session.get(url, headers=headers, stream=True, timeout=60)
+            # 无论成功与否都关闭响应，连接归还连接池
+            with response:
+                response.raise_for_status()
+                
+                # 检查是否是PDF（在创建文件和读取正文之前）
+                content_type = response.headers.get('content-type', '')
+                if 'application/pdf' not in content_type and not is_pdf_url:
+                    return False, "链接不是有效的PDF文件", ""
+                
+                # 生成文件名
+                filepath = self._reserve_filepath(title)
+                try:
+                    self._write_file(response, filepath, progress_callback)
+                except BaseException:
+                    # 中途失败时删除预留的文件，避免留下按Content-Length补零、大小与完整PDF相同的残缺文件
+                    try:
+                        os.remove(filepath)
+                    except OSError:
+                        pass
+                    raise
             
             # 添加到下载历史
-            download_history.add_download(title, filepath, url)
+            (batch if batch is not None else download_history).add_download(title, filepath, url)
             
             return True, f"成功下载到: {filepath}", filepath
             
@@ -114,15 +234,19 @@ class DownloadManager:
             return False, f"下载失败: {str(e)}", ""
         except Exception as e:
             return False, f"发生错误: {str(e)}", ""
+        finally:
+            with self._lock:
+                self._downloading.discard(key)
     
     def download_multiple(self, papers: List[dict], 
-                         progress_callback=None) -> dict:
+                         progress_callback=None, concurrency: Optional[int] = None) -> dict:
         """
-        批量下载多个PDF
+        批量并发下载多个PDF
         
         Args:
             papers: 论文列表，每个论文包含title和pdf_url
-            progress_callback: 进度回调函数
+            progress_callback: 进度回调函数，每完成一篇调用一次 (已完成序号, 总数)
+            concurrency: 同时下载的最大数量，默认使用 Config.MAX_DOWNLOAD_WORKERS
             
         Returns:
             下载结果统计
@@ -134,32 +258,44 @@ class DownloadManager:
             'total': len(papers)
         }
         
-        for idx, paper in enumerate(papers):
+        if concurrency is None:
+            from config import Config
+            concurrency = Config.MAX_DOWNLOAD_WORKERS
+        
+        def download(idx, paper):
             title = paper.get('title', f'paper_{idx}')
             pdf_url = paper.get('pdf_url', '')
-            
-            if progress_callback:
-                progress_callback(idx, len(papers))
-            
-            success, message, filepath = self.download_pdf(pdf_url, title)
-            
-            if success:
-                results['success'].append({
-                    'title': title,
-                    'message': message,
-                    'filepath': filepath
-                })
-            elif "已下载过" in message:
-                results['skipped'].append({
-                    'title': title,
-                    'message': message
-                })
-            else:
-                results['failed'].append({
-                    'title': title,
-                    'message': message
-                })
+            return title, self.download_pdf(pdf_url, title, batch=batch)
         
+        # 整批下载记录暂存在批次中，结束时合并为一次事务写入
+        with download_history.begin_batch() as batch:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                futures = [executor.submit(download, idx, paper) for idx, paper in enumerate(papers)]
+                
+                # 在调用线程中汇总结果，进度回调不会跨线程触发
+                for done, future in enumerate(as_completed(futures)):
+                    title, (success, message, filepath) = future.result()
+                    
+                    if success:
+                        results['success'].append({
+                            'title': title,
+                            'message': message,
+                            'filepath': filepath
+                        })
+                    elif "已下载过" in message:
+                        results['skipped'].append({
+                            'title': title,
+                            'message': message
+                        })
+                    else:
+                        results['failed'].append({
+                            'title': title,
+                            'message': message
+                        })
+                    
+                    if progress_callback:
+                        progress_callback(done, len(papers))
+            
         return results
     
     def set_download_path(self, path: str):
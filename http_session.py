@@ -0,0 +1,40 @@
+"""共享HTTP会话：复用连接池，避免每次请求重新建立TCP/TLS连接"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_connections: int = 32, pool_maxsize: int = 64, retries: int = 3) -> requests.Session:
+    """
+    创建带连接池和自动重试的会话
+    
+    Args:
+        pool_connections: 缓存连接池的主机数
+        pool_maxsize: 每个主机的最大连接数
+        retries: 连接失败或返回429/5xx时的最大重试次数
+    
+    Returns:
+        配置好的requests会话
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        # 重试用尽后返回最后一次响应，由调用方按状态码处理
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # 标明客户端身份（arXiv等API要求）
+    session.headers['User-Agent'] = f'paper_search (python-requests/{requests.__version__})'
+    # 声明urllib3能解码的全部压缩格式（安装brotli后包含br），而不只是requests默认的gzip, deflate
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+
+# 创建全局会话实例（线程间共享）
+session = create_session()
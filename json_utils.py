@@ -0,0 +1,59 @@
+"""JSON序列化工具：优先使用orjson，未安装时回退到标准库json"""
+import json
+from typing import Any, Union
+
+# orjson支持（可选）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    解析JSON
+    
+    Args:
+        data: JSON文本（str或bytes）
+        
+    Returns:
+        解析后的对象
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    序列化为JSON文本（保留非ASCII字符）
+    
+    Args:
+        obj: 要序列化的对象
+        indent: 是否缩进2格输出
+        
+    Returns:
+        JSON文本
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """
+    序列化为UTF-8编码的JSON字节串（用作HTTP请求体或写入二进制文件）
+    
+    Args:
+        obj: 要序列化的对象
+        
+    Returns:
+        JSON字节串
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
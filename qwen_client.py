@@ -1,7 +1,17 @@
-import requests
-import json
-from typing import Optional
+import re
+from typing import Iterator, Optional
 from config import Config
+from http_session import session
+from rate_limiter import RateLimiter
+import json_utils
+from translation_cache import translation_cache
+
+
+# 单段翻译的提示词
+_TRANSLATE_PROMPT = "请将以下英文翻译成中文，只返回翻译结果，不要有任何解释：\n\n{text}"
+
+# 批量翻译时的段落编号格式，例如 <<<1>>>
+_BATCH_MARKER_RE = re.compile(r'<<<(\d+)>>>\s*(.*?)(?=<<<\d+>>>|\Z)', re.DOTALL)
 
 
 class QwenClient:
@@ -11,10 +21,71 @@ class QwenClient:
         self.api_key = Config.QWEN_API_KEY
         self.api_url = Config.QWEN_API_URL
         self.model = Config.QWEN_MODEL
+        self.rate_limiter = RateLimiter(Config.QWEN_RATE_LIMIT)
+    
+    def _build_request(self, prompt: str, stream: bool = False) -> tuple[dict, dict]:
+        """
+        构建单轮对话请求的请求头和请求体
+        
+        Args:
+            prompt: 用户消息内容
+            stream: 是否使用流式输出
+            
+        Returns:
+            (请求头, 请求体)
+        """
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': f'Bearer {self.api_key}'
+        }
+        
+        # 使用OpenAI兼容模式的API格式
+        data = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        }
+        if stream:
+            data["stream"] = True
+        return headers, data
+    
+    def _chat(self, prompt: str, timeout: int = 30) -> Optional[str]:
+        """
+        发送单轮对话请求
+        
+        Args:
+            prompt: 用户消息内容
+            timeout: 请求超时时间（秒）
+            
+        Returns:
+            模型返回的文本，失败返回None
+        """
+        headers, data = self._build_request(prompt)
+        
+        self.rate_limiter.acquire()
+        response = session.post(
+            self.api_url + "/chat/completions",
+            headers=headers,
+            data=json_utils.dumps_bytes(data),
+            timeout=timeout
+        )
+        
+        if response.status_code == 200:
+            result = json_utils.loads(response.content)
+            # OpenAI兼容格式的响应
+            if 'choices' in result and len(result['choices']) > 0:
+                return result['choices'][0]['message']['content'].strip()
+        else:
+            print(f"翻译失败: {response.status_code} - {response.text}")
+        return None
         
     def translate_to_chinese(self, text: str) -> Optional[str]:
         """
-        将英文文本翻译成中文
+        将英文文本翻译成中文（优先使用磁盘缓存）
         
         Args:
             text: 需要翻译的英文文本
@@ -24,61 +95,149 @@ class QwenClient:
         """
         if not text or not text.strip():
             return ""
+        
+        cached = translation_cache.get(text)
+        if cached:
+            return cached
             
         try:
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {self.api_key}'
-            }
-            
-            prompt = f"请将以下英文翻译成中文，只返回翻译结果，不要有任何解释：\n\n{text}"
+            translation = self._chat(_TRANSLATE_PROMPT.format(text=text))
+            translation_cache.set(text, translation)
+            return translation
+                
+        except Exception as e:
+            print(f"翻译出错: {str(e)}")
+            return None
+    
+    def translate_stream(self, text: str) -> Iterator[str]:
+        """
+        流式翻译，译文边生成边返回（缓存命中时一次性返回完整译文）
+        
+        Args:
+            text: 需要翻译的英文文本
             
-            # 使用OpenAI兼容模式的API格式
-            data = {
-                "model": self.model,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            }
+        Yields:
+            译文片段，失败时不再产出
+        """
+        if not text or not text.strip():
+            return
+        
+        cached = translation_cache.get(text)
+        if cached:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            headers, data = self._build_request(_TRANSLATE_PROMPT.format(text=text), stream=True)
             
-            response = requests.post(
+            self.rate_limiter.acquire()
+            with session.post(
                 self.api_url + "/chat/completions",
                 headers=headers,
-                json=data,
+                data=json_utils.dumps_bytes(data),
+                stream=True,
                 timeout=30
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                # OpenAI兼容格式的响应
-                if 'choices' in result and len(result['choices']) > 0:
-                    translation = result['choices'][0]['message']['content']
-                    return translation.strip()
-            else:
-                print(f"翻译失败: {response.status_code} - {response.text}")
-                return None
+            ) as response:
+                if response.status_code != 200:
+                    print(f"翻译失败: {response.status_code} - {response.text}")
+                    return
                 
+                # SSE格式: 每行 "data: {...}"，以 "data: [DONE]" 结束
+                for line in response.iter_lines():
+                    line = line.decode('utf-8').strip()
+                    if not line.startswith('data:'):
+                        continue
+                    payload = line[len('data:'):].strip()
+                    if payload == '[DONE]':
+                        break
+                    choices = json_utils.loads(payload).get('choices') or []
+                    if choices:
+                        content = (choices[0].get('delta') or {}).get('content')
+                        if content:
+                            parts.append(content)
+                            yield content
+            
+            # 完整接收后写入缓存
+            translation_cache.set(text, ''.join(parts).strip())
+                            
         except Exception as e:
             print(f"翻译出错: {str(e)}")
-            return None
+    
+    def translate_batch(self, texts: list[str]) -> list[Optional[str]]:
+        """
+        在一次请求中翻译多段文本
+        
+        各段文本以 <<<序号>>> 标记拼接成一条消息，再按序号拆分模型的返回结果。
+        返回结果无法与输入一一对应时，逐条回退为单独翻译。
+        
+        Args:
+            texts: 需要翻译的文本列表
+            
+        Returns:
+            与输入顺序一致的翻译结果列表
+        """
+        results: list[Optional[str]] = ["" for _ in texts]
+        pending = []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            cached = translation_cache.get(text)
+            if cached:
+                results[i] = cached
+            else:
+                pending.append(i)
+        if not pending:
+            return results
+        if len(pending) == 1:
+            results[pending[0]] = self.translate_to_chinese(texts[pending[0]])
+            return results
+        
+        parsed = {}
+        try:
+            segments = "\n\n".join(
+                f"<<<{n}>>>\n{texts[i].strip()}" for n, i in enumerate(pending, 1)
+            )
+            prompt = (
+                "请将以下每段英文分别翻译成中文。每段译文前保留原有的 <<<序号>>> 标记，"
+                "按原顺序逐段返回，只返回翻译结果，不要有任何解释：\n\n"
+                f"{segments}"
+            )
+            response = self._chat(prompt, timeout=30 + 10 * len(pending))
+            if response:
+                parsed = {
+                    int(num): translation.strip()
+                    for num, translation in _BATCH_MARKER_RE.findall(response)
+                }
+        except Exception as e:
+            print(f"批量翻译出错: {str(e)}")
+        
+        for n, i in enumerate(pending, 1):
+            translation = parsed.get(n)
+            if translation:
+                translation_cache.set(texts[i], translation)
+            else:
+                # 批量结果缺失该段，回退为单独翻译
+                translation = self.translate_to_chinese(texts[i])
+            results[i] = translation
+        return results
     
     def batch_translate(self, texts: list[str]) -> list[Optional[str]]:
         """
         批量翻译文本
         
+        每 TRANSLATE_BATCH_SIZE 段合并为一次请求，由 translate_batch 按序号拆分结果
+        
         Args:
             texts: 需要翻译的文本列表
             
         Returns:
             翻译结果列表
         """
+        batch_size = max(1, Config.TRANSLATE_BATCH_SIZE)
         results = []
-        for text in texts:
-            translation = self.translate_to_chinese(text)
-            results.append(translation)
+        for start in range(0, len(texts), batch_size):
+            results.extend(self.translate_batch(texts[start:start + batch_size]))
         return results
 
 
@@ -0,0 +1,98 @@
+"""请求限流：令牌桶限流器，翻译API和Google Scholar共用"""
+import math
+import os
+import threading
+import time
+from typing import Optional
+import json_utils
+
+
+class RateLimitedError(Exception):
+    """站点处于限流冷却期，retry_after为距冷却结束的秒数"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"访问受限，请在 {math.ceil(retry_after / 60)} 分钟后重试")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """
+    令牌桶限流器（线程安全）：按固定速率补充令牌，允许少量突发
+    
+    令牌不足时在锁内预订令牌并算出等待时间，释放锁后再等待，等待期间不阻塞其他调用方。
+    被站点拦截后可进入冷却期，冷却截止时间可保存到文件，重启后仍然有效。
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[int] = None, state_file: Optional[str] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量，即允许的突发请求数，默认为每秒速率（至少为1）
+            state_file: 保存冷却截止时间的JSON文件，None表示不持久化
+        """
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.state_file = state_file
+        self.blocked_until = self._load_blocked_until()
+        self.lock = threading.Lock()
+    
+    def _load_blocked_until(self) -> float:
+        """读取上次保存的冷却截止时间（Unix时间戳）"""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return 0.0
+        try:
+            with open(self.state_file, 'rb') as f:
+                return float(json_utils.loads(f.read()).get('blocked_until', 0))
+        except Exception as e:
+            print(f"读取限流状态失败: {e}")
+            return 0.0
+    
+    def blocked_remaining(self) -> float:
+        """距冷却结束的秒数，未处于冷却期时为0"""
+        return max(0.0, self.blocked_until - time.time())
+    
+    def acquire(self):
+        """
+        在发起请求前调用：取得一个令牌，令牌不足时等待
+        
+        Raises:
+            RateLimitedError: 处于冷却期（包括等待期间进入冷却期）
+        """
+        with self.lock:
+            remaining = self.blocked_remaining()
+            if remaining > 0:
+                raise RateLimitedError(remaining)
+            
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 先扣除令牌（可为负数，即预订之后补充的令牌），后来的调用方依次排在后面
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        
+        if wait > 0:
+            time.sleep(wait)
+            remaining = self.blocked_remaining()
+            if remaining > 0:
+                raise RateLimitedError(remaining)
+    
+    def block(self, seconds: float):
+        """
+        被站点拦截时调用：清空令牌并在指定时间内拒绝请求
+        
+        Args:
+            seconds: 冷却时间（秒）
+        """
+        with self.lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
+            self.blocked_until = time.time() + seconds
+            if not self.state_file:
+                return
+            try:
+                with open(self.state_file, 'w', encoding='utf-8') as f:
+                    f.write(json_utils.dumps({'blocked_until': self.blocked_until}))
+            except Exception as e:
+                print(f"保存限流状态失败: {e}")
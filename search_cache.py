@@ -0,0 +1,174 @@
+"""搜索结果缓存模块"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import json_utils
+
+
+def _copy_papers(papers: List[Dict]) -> List[Dict]:
+    """复制论文字典（包括作者列表），调用方修改结果时不会影响缓存中的内容"""
+    return [dict(paper, authors=list(paper.get('authors') or [])) for paper in papers]
+
+
+class SearchCache:
+    """各搜索引擎结果的持久化缓存（SQLite存储，按TTL过期，前置内存LRU）"""
+    
+    def __init__(self, cache_file: str = None, memory_size: int = 256):
+        """
+        初始化搜索缓存
+        
+        Args:
+            cache_file: 缓存数据库文件路径
+            memory_size: 内存中保留的最近查询数
+        """
+        if cache_file is None:
+            # 默认保存在项目根目录
+            project_root = os.path.dirname(os.path.abspath(__file__))
+            cache_file = os.path.join(project_root, 'search_cache.sqlite')
+        
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.conn = self._connect()
+        # 最近使用的查询: 缓存键 -> (写入时间, 论文字典列表)，命中时无需读库和反序列化
+        self.memory = OrderedDict()
+        self.memory_size = memory_size
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开数据库并创建表"""
+        try:
+            conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, created REAL, papers TEXT)'
+            )
+            conn.commit()
+            return conn
+        except Exception as e:
+            print(f"打开搜索缓存失败: {e}")
+            return None
+    
+    @staticmethod
+    def make_key(engine: str, keywords: str, start_date: Optional[str],
+                 end_date: Optional[str], max_results: int) -> str:
+        """
+        计算一次搜索的缓存键
+        
+        Args:
+            engine: 搜索引擎名称
+            keywords: 搜索关键词
+            start_date: 开始日期
+            end_date: 结束日期
+            max_results: 最大结果数
+        
+        Returns:
+            缓存键
+        """
+        raw = f'{engine}|{keywords}|{start_date}|{end_date}|{max_results}'
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str, ttl: float) -> Optional[List[Dict]]:
+        """
+        查询未过期的搜索结果
+        
+        Args:
+            key: 缓存键
+            ttl: 有效期（秒）
+        
+        Returns:
+            论文字典列表（缓存内容的副本），未命中或已过期返回None
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if now - entry[0] < ttl:
+                    self.memory.move_to_end(key)
+                    return _copy_papers(entry[1])
+                del self.memory[key]
+        
+        if self.conn is None:
+            return None
+        try:
+            with self.lock:
+                row = self.conn.execute(
+                    'SELECT created, papers FROM searches WHERE key = ?', (key,)
+                ).fetchone()
+            if row and now - row[0] < ttl:
+                papers = json_utils.loads(row[1])
+                self._remember(key, row[0], papers)
+                return _copy_papers(papers)
+        except Exception as e:
+            print(f"读取搜索缓存失败: {e}")
+        return None
+    
+    def _remember(self, key: str, created: float, papers: List[Dict]):
+        """放入内存LRU，超出容量时淘汰最久未使用的查询"""
+        with self.lock:
+            self.memory[key] = (created, papers)
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+    
+    def set(self, key: str, papers: List[Dict]):
+        """
+        写入搜索结果
+        
+        搜索失败或结果不完整时搜索引擎会抛出异常而不会调用本方法，
+        因此空列表表示查询确实没有结果，同样缓存，避免重复请求。
+        
+        Args:
+            key: 缓存键
+            papers: 论文字典列表
+        """
+        created = time.time()
+        # 保存副本：调用方之后修改传入的论文（如同一个作者列表）不会改变缓存
+        self._remember(key, created, _copy_papers(papers))
+        if self.conn is None:
+            return
+        try:
+            with self.lock:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO searches (key, created, papers) VALUES (?, ?, ?)',
+                    (key, created, json_utils.dumps(papers))
+                )
+                self.conn.commit()
+        except Exception as e:
+            print(f"保存搜索缓存失败: {e}")
+    
+    def delete(self, key: str):
+        """
+        删除一条搜索结果
+        
+        Args:
+            key: 缓存键
+        """
+        with self.lock:
+            self.memory.pop(key, None)
+        if self.conn is None:
+            return
+        try:
+            with self.lock:
+                self.conn.execute('DELETE FROM searches WHERE key = ?', (key,))
+                self.conn.commit()
+        except Exception as e:
+            print(f"删除搜索缓存失败: {e}")
+    
+    def clear(self):
+        """清空搜索缓存"""
+        with self.lock:
+            self.memory.clear()
+        if self.conn is None:
+            return
+        try:
+            with self.lock:
+                self.conn.execute('DELETE FROM searches')
+                self.conn.commit()
+        except Exception as e:
+            print(f"清空搜索缓存失败: {e}")
+
+
+# 创建全局搜索缓存实例
+search_cache = SearchCache()
@@ -1,11 +1,64 @@
-import arxiv
-import requests
-from bs4 import BeautifulSoup
-from datetime import datetime
-from typing import List, Dict, Optional
+import atexit
+import functools
+import logging
+import math
+import os
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+from xml.etree import ElementTree
+from typing import Iterator, List, Dict, Optional
+from urllib.parse import urlencode
 import time
 import random
 from config import Config
+from http_session import create_session, session
+from rate_limiter import RateLimitedError, RateLimiter
+from search_cache import search_cache
+import json_utils
+
+# 逐篇论文的解析和过滤明细只在DEBUG级别输出
+logger = logging.getLogger(__name__)
+
+# OpenReview V2 搜索API（单次请求最多返回100条）
+_OPENREVIEW_SEARCH_URL = "https://api2.openreview.net/notes/search"
+_OPENREVIEW_PAGE_SIZE = 100
+_OPENREVIEW_MAX_CONCURRENCY = 5  # 分页并发请求数上限
+# 只请求用到的字段，不下载评审意见等大段内容
+_OPENREVIEW_SELECT = 'id,cdate,content.title,content.abstract,content.summary,content.authors'
+
+# arXiv API（Atom格式），用于ArXiv搜索和批量获取完整摘要
+_ARXIV_API_URL = "https://export.arxiv.org/api/query"
+_ARXIV_PAGE_SIZE = 100  # 有开始日期时的分页大小（早于开始日期即停止，页小则少取无用结果）
+_ARXIV_MAX_PAGE_SIZE = 1000  # 无开始日期时单次请求的最大条数（API相邻请求需间隔3秒，一次取完最快）
+_ATOM = '{http://www.w3.org/2005/Atom}'
+# 解析entry用到的标签路径（避免逐条拼接字符串）
+_ATOM_ENTRY = _ATOM + 'entry'
+_ATOM_ID = _ATOM + 'id'
+_ATOM_PUBLISHED = _ATOM + 'published'
+_ATOM_TITLE = _ATOM + 'title'
+_ATOM_SUMMARY = _ATOM + 'summary'
+_ATOM_LINK = _ATOM + 'link'
+_ATOM_AUTHOR_NAME = _ATOM + 'author/' + _ATOM + 'name'
+_OPENSEARCH_TOTAL = '{http://a9.com/-/spec/opensearch/1.1/}totalResults'
+# arXiv偶尔返回空页或条目缺失的页，重试的次数（与arxiv包的默认num_retries相同）
+_ARXIV_PAGE_RETRIES = 3
+# arXiv链接中的论文ID（去掉版本号），如 arxiv.org/abs/2101.00001v2 -> 2101.00001
+_ARXIV_ID_RE = re.compile(r'arxiv\.org/(?:abs|pdf)/([^?#]+?)(?:v\d+)?(?:\.pdf)?/?(?:[?#]|$)')
+
+# 重复论文的保留优先级（数值越小越优先）：ArXiv和OpenReview的摘要、日期更完整
+_SOURCE_PRIORITY = {'ArXiv': 0, 'OpenReview': 1, 'Google Scholar': 2}
+
+# Google Scholar标题前的类型标记，如 [PDF]、[HTML]、[图书]
+_TITLE_TAG_RE = re.compile(r'\[(?:HTML|PDF|图书|B|Book|引用|CITATION)\]\s*')
+
+# 去重时忽略标题中的标点和空白
+_NON_WORD_RE = re.compile(r'\W+')
+# 去除标点和空白后短于该长度的标题（如 "Introduction"、"Editorial"），去重时还需第一作者相同
+_SHORT_TITLE_LEN = 16
 
 # Selenium支持（可选）
 try:
@@ -16,6 +69,7 @@ try:
     from selenium.webdriver.support import expected_conditions as EC
     from webdriver_manager.chrome import ChromeDriverManager
     from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import TimeoutException, WebDriverException
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
@@ -24,6 +78,9 @@ except ImportError:
 class Paper:
     """论文数据类"""
     
+    # 固定字段，实例不再携带__dict__，大量结果时更省内存
+    __slots__ = ('title', 'abstract', 'url', 'pdf_url', 'authors', 'published', 'source', '_lc_content')
+    
     def __init__(self, title: str, abstract: str, url: str, pdf_url: Optional[str] = None,
                  authors: List[str] = None, published: Optional[str] = None, source: str = ""):
         self.title = title
@@ -33,6 +90,14 @@ class Paper:
         self.authors = authors or []
         self.published = published
         self.source = source
+        self._lc_content = None
+    
+    @property
+    def lc_content(self) -> str:
+        """小写的标题+摘要，用于关键词过滤（首次访问时计算，之后复用）"""
+        if self._lc_content is None:
+            self._lc_content = (self.title + ' ' + self.abstract).lower()
+        return self._lc_content
         
     def to_dict(self) -> Dict:
         """转换为字典格式"""
@@ -45,10 +110,75 @@ class Paper:
             'published': self.published,
             'source': self.source
         }
+    
+    def __repr__(self) -> str:
+        return f"Paper(title={self.title!r}, source={self.source!r}, url={self.url!r})"
+
+
+def _extract_arxiv_id(url: str) -> Optional[str]:
+    """
+    从arXiv链接中提取论文ID
+    
+    Args:
+        url: 论文链接
+        
+    Returns:
+        不含版本号的arXiv ID，不是arXiv链接时返回None
+    """
+    match = _ARXIV_ID_RE.search(url) if url else None
+    return match.group(1) if match else None
+
+
+@functools.lru_cache(maxsize=None)
+def _xpath(expr: str):
+    """
+    编译XPath表达式，同一表达式在进程内只编译一次
+    
+    Args:
+        expr: XPath表达式
+        
+    Returns:
+        可直接调用的 lxml.etree.XPath 对象，如 _xpath('.//h3')(element)
+    """
+    # 延迟导入：只使用其他来源时无需加载lxml
+    from lxml import etree
+    return etree.XPath(expr)
+
+
+@functools.lru_cache(maxsize=None)
+def _by_class(name: str, axis: str = './/'):
+    """
+    按CSS类名匹配元素的编译后XPath（与 class 属性中的某个类名完全匹配）
+    
+    Args:
+        name: 类名
+        axis: XPath轴，默认查找所有后代元素
+        
+    Returns:
+        编译后的XPath对象
+    """
+    return _xpath(f"{axis}*[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]")
+
+
+def _first(elements: list):
+    """返回XPath结果中的第一个元素，没有时返回None"""
+    return elements[0] if elements else None
+
+
+def _source_priority(paper: 'Paper') -> int:
+    """去重时论文来源的优先级，未知来源最低"""
+    return _SOURCE_PRIORITY.get(paper.source, len(_SOURCE_PRIORITY))
+
+
+class SearchError(Exception):
+    """搜索未能完整完成（接口返回错误、翻页中途失败等），结果不可信且不应缓存"""
 
 
 class SearchEngine:
-    """学术搜索引擎基类"""
+    """学术搜索引擎基类（search负责结果缓存，子类实现_do_search）"""
+    
+    # 来源名称，用于日志输出
+    name = ""
     
     def __init__(self):
         # 不在初始化时固定max_results，改为每次搜索时动态获取
@@ -56,21 +186,125 @@ class SearchEngine:
     
     @property
     def max_results(self):
-        """动态获取最大结果数"""
-        from config import Config
+        """动态获取最大结果数（每次搜索开始时读取一次，保存为局部变量使用）"""
         return Config.MAX_RESULTS
+    
+    def _cache_key(self, keywords: str, start_date: Optional[str], end_date: Optional[str]) -> str:
+        """本引擎一次搜索的缓存键"""
+        return search_cache.make_key(type(self).__name__, keywords, start_date, end_date, self.max_results)
         
     def search(self, keywords: str, start_date: Optional[str] = None, 
                end_date: Optional[str] = None) -> List[Paper]:
-        """搜索论文"""
+        """
+        搜索论文，优先使用未过期的磁盘缓存（有效期为Config.SEARCH_CACHE_TTL）
+        
+        Args:
+            keywords: 搜索关键词
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            
+        Returns:
+            论文列表
+            
+        Raises:
+            SearchError: 搜索失败或结果不完整（不写入缓存）
+        """
+        ttl = Config.SEARCH_CACHE_TTL
+        if ttl <= 0:
+            return self._do_search(keywords, start_date, end_date)
+        
+        key = self._cache_key(keywords, start_date, end_date)
+        cached = search_cache.get(key, ttl)
+        if cached is not None:
+            print(f"💾 {self.name} 使用缓存结果 ({len(cached)} 篇)")
+            return [Paper(**paper) for paper in cached]
+        
+        # _do_search正常返回才说明结果完整，出错时异常直接抛给调用方，不会写入缓存
+        papers = self._do_search(keywords, start_date, end_date)
+        search_cache.set(key, [paper.to_dict() for paper in papers])
+        return papers
+    
+    def invalidate(self, keywords: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None):
+        """
+        删除一次搜索的缓存结果，下次搜索重新请求
+        
+        Args:
+            keywords: 搜索关键词
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+        """
+        search_cache.delete(self._cache_key(keywords, start_date, end_date))
+    
+    def _do_search(self, keywords: str, start_date: Optional[str] = None,
+                   end_date: Optional[str] = None) -> List[Paper]:
+        """
+        实际执行搜索（不经过缓存），由子类实现
+        
+        出错或只取到部分结果时必须抛出异常（SearchError），不能返回空列表或部分结果
+        """
         raise NotImplementedError
 
 
 class ArxivSearchEngine(SearchEngine):
-    """ArXiv搜索引擎"""
+    """ArXiv搜索引擎（直接调用arXiv API，与其他来源共用同一个HTTP连接池）"""
     
-    def search(self, keywords: str, start_date: Optional[str] = None, 
-               end_date: Optional[str] = None) -> List[Paper]:
+    name = "ArXiv"
+    
+    def _iter_entries(self, keywords: str, max_results: int,
+                      page_size: int = _ARXIV_PAGE_SIZE) -> Iterator[ElementTree.Element]:
+        """
+        按提交日期降序分页获取搜索结果（调用方停止迭代后不再请求后续页）
+        
+        Args:
+            keywords: 搜索关键词
+            max_results: 最大结果数
+            page_size: 每页条数
+            
+        Yields:
+            Atom格式的entry元素
+            
+        Raises:
+            SearchError: 重试后结果页仍不完整
+            requests.HTTPError: 请求失败
+        """
+        for offset in range(0, max_results, page_size):
+            limit = min(page_size, max_results - offset)
+            params = {
+                'search_query': keywords,
+                'start': offset,
+                'max_results': limit,
+                'sortBy': 'submittedDate',
+                'sortOrder': 'descending'
+            }
+            for attempt in range(_ARXIV_PAGE_RETRIES + 1):
+                _arxiv_throttle.wait()
+                response = session.get(_ARXIV_API_URL, params=params, timeout=30)
+                response.raise_for_status()
+                feed = ElementTree.fromstring(response.content)
+                entries = feed.findall(_ATOM_ENTRY)
+                
+                # 按总结果数判断本页应有的条数，条目缺失时重试，而不是当作结果已取完
+                total = (feed.findtext(_OPENSEARCH_TOTAL) or '').strip()
+                if total.isdigit():
+                    expected = min(limit, int(total) - offset)
+                else:
+                    # 没有总数时只能识别空页
+                    expected = 1 if offset else 0
+                if len(entries) >= expected:
+                    break
+                if attempt < _ARXIV_PAGE_RETRIES:
+                    print(f"⚠️ arXiv结果页不完整（第{offset}条起，{len(entries)}/{expected}），重试...")
+            else:
+                raise SearchError(f"arXiv结果页重试{_ARXIV_PAGE_RETRIES}次后仍不完整（第{offset}条起）")
+            
+            yield from entries
+            # 不足一页说明结果已取完
+            if len(entries) < limit:
+                return
+    
+    def _do_search(self, keywords: str, start_date: Optional[str] = None, 
+                   end_date: Optional[str] = None) -> List[Paper]:
         """
         在ArXiv上搜索论文
         
@@ -81,54 +315,122 @@ class ArxivSearchEngine(SearchEngine):
             
         Returns:
             论文列表
+            
+        Raises:
+            SearchError: 结果页不完整
+            requests.RequestException: 请求失败（翻页中途失败时不返回已取到的部分结果）
         """
         papers = []
         
-        try:
-            # 构建查询
-            query = keywords
-            
-            # 创建搜索客户端
-            client = arxiv.Client()
-            search = arxiv.Search(
-                query=query,
-                max_results=self.max_results,
-                sort_by=arxiv.SortCriterion.SubmittedDate,
-                sort_order=arxiv.SortOrder.Descending
-            )
+        # 日期范围只解析一次，循环中直接比较date对象
+        start = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        
+        # 执行搜索
+        page_size = _ARXIV_PAGE_SIZE if start else _ARXIV_MAX_PAGE_SIZE
+        for entry in self._iter_entries(keywords, self.max_results, page_size):
+            # 检查日期范围（published形如 2024-05-10T23:30:00Z）
+            published_text = entry.findtext(_ATOM_PUBLISHED)
+            if not published_text:
+                continue
+            published = date.fromisoformat(published_text[:10])
             
-            # 执行搜索
-            for result in client.results(search):
-                # 检查日期范围
-                published_date = result.published.strftime('%Y-%m-%d')
-                
-                if start_date and published_date < start_date:
-                    continue
-                if end_date and published_date > end_date:
-                    continue
-                
-                paper = Paper(
-                    title=result.title,
-                    abstract=result.summary,
-                    url=result.entry_id,
-                    pdf_url=result.pdf_url,
-                    authors=[author.name for author in result.authors],
-                    published=published_date,
-                    source="ArXiv"
-                )
-                papers.append(paper)
-                
-        except Exception as e:
-            print(f"ArXiv搜索出错: {str(e)}")
+            # 结果按提交日期降序排列，早于开始日期后其余结果都更早，无需继续翻页
+            if start and published < start:
+                break
+            if end and published > end:
+                continue
+            
+            published_date = published.isoformat()
             
+            pdf_url = next(
+                (link.get('href') for link in entry.iterfind(_ATOM_LINK)
+                 if link.get('title') == 'pdf'),
+                None
+            )
+            
+            paper = Paper(
+                title=' '.join(entry.findtext(_ATOM_TITLE, '').split()),
+                abstract=' '.join(entry.findtext(_ATOM_SUMMARY, '').split()),
+                url=entry.findtext(_ATOM_ID, ''),
+                pdf_url=pdf_url,
+                authors=[name.text or '' for name in entry.iterfind(_ATOM_AUTHOR_NAME)],
+                published=published_date,
+                source="ArXiv"
+            )
+            papers.append(paper)
+        
         return papers
 
 
+def _v(field):
+    """从OpenReview V2 API的字段中提取值（V2字段为 {'value': ...} 对象）"""
+    return field.get('value', '') if type(field) is dict else (field or '')
+
+
 class OpenReviewSearchEngine(SearchEngine):
     """OpenReview搜索引擎"""
     
-    def search(self, keywords: str, start_date: Optional[str] = None, 
-               end_date: Optional[str] = None) -> List[Paper]:
+    name = "OpenReview"
+    # 接口拒绝select参数（返回400）后不再携带
+    _select_supported = True
+    
+    def _fetch_notes(self, keywords: str, max_results: int) -> List[Dict]:
+        """
+        分页并发获取搜索结果（API单次最多返回100条）
+        
+        Args:
+            keywords: 搜索关键词
+            max_results: 最大结果数
+            
+        Returns:
+            按顺序合并的note列表
+            
+        Raises:
+            SearchError: 任一页请求失败（部分结果不可信，不返回）
+        """
+        max_results = max(1, max_results)
+        pages = math.ceil(max_results / _OPENREVIEW_PAGE_SIZE)
+        cls = type(self)
+        
+        def fetch_page(page):
+            """获取一页结果，返回 (该页note列表, 是否为满页)"""
+            offset = page * _OPENREVIEW_PAGE_SIZE
+            limit = min(_OPENREVIEW_PAGE_SIZE, max_results - offset)
+            params = {
+                'term': keywords,
+                'limit': limit,
+                'offset': offset
+            }
+            if cls._select_supported:
+                params['select'] = _OPENREVIEW_SELECT
+            response = session.get(_OPENREVIEW_SEARCH_URL, params=params, timeout=30)
+            if response.status_code == 400 and 'select' in params:
+                print("OpenReview API不支持select参数，改为获取完整结果")
+                cls._select_supported = False
+                del params['select']
+                response = session.get(_OPENREVIEW_SEARCH_URL, params=params, timeout=30)
+            if response.status_code != 200:
+                raise SearchError(f"OpenReview API响应错误: {response.status_code}")
+            page_notes = json_utils.loads(response.content).get('notes', [])
+            return page_notes, len(page_notes) >= limit
+        
+        # 先取第一页，结果不足一页时无需再请求后续页
+        notes, full = fetch_page(0)
+        if not full or pages == 1:
+            return notes
+        
+        # 其余页并发获取（限制并发数，避免触发API限流）
+        with ThreadPoolExecutor(max_workers=min(pages - 1, _OPENREVIEW_MAX_CONCURRENCY)) as executor:
+            for page_notes, full in executor.map(fetch_page, range(1, pages)):
+                notes.extend(page_notes)
+                # 不足一页说明结果已取完，后续页为空
+                if not full:
+                    break
+        return notes
+    
+    def _do_search(self, keywords: str, start_date: Optional[str] = None, 
+                   end_date: Optional[str] = None) -> List[Paper]:
         """
         在OpenReview上搜索论文
         
@@ -139,89 +441,211 @@ class OpenReviewSearchEngine(SearchEngine):
             
         Returns:
             论文列表
+            
+        Raises:
+            SearchError: 接口返回错误
         """
         papers = []
         
-        try:
-            # OpenReview V2 搜索API
-            url = "https://api2.openreview.net/notes/search"
-            params = {
-                'term': keywords,
-                'limit': min(self.max_results, 100),
-                'offset': 0
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
+        max_results = self.max_results
+        notes = self._fetch_notes(keywords, max_results)
+        
+        for note in notes[:max_results]:
+            content = note.get('content') or {}
             
-            if response.status_code == 200:
-                data = response.json()
-                notes = data.get('notes', [])
-                
-                for note in notes[:self.max_results]:
-                    content = note.get('content', {})
-                    
-                    # 提取日期 (V2 API格式)
-                    cdate = note.get('cdate', 0)
-                    if cdate:
-                        published_date = datetime.fromtimestamp(cdate / 1000).strftime('%Y-%m-%d')
-                    else:
-                        published_date = None
-                    
-                    # 检查日期范围
-                    if published_date:
-                        if start_date and published_date < start_date:
-                            continue
-                        if end_date and published_date > end_date:
-                            continue
-                    
-                    # V2 API的content结构不同，字段可能是对象
-                    def get_value(field):
-                        """从V2 API的字段中提取值"""
-                        if isinstance(field, dict):
-                            return field.get('value', '')
-                        return field if field else ''
-                    
-                    title = get_value(content.get('title', ''))
-                    if not title or title == 'No Title':
-                        # 跳过没有标题的论文（通常是评论或其他非正式内容）
-                        continue
-                    
-                    abstract = get_value(content.get('abstract', ''))
-                    if not abstract:
-                        # 尝试从其他字段获取摘要
-                        abstract = get_value(content.get('summary', ''))
-                    if not abstract:
-                        abstract = 'No Abstract'
-                    
-                    authors = content.get('authors', [])
-                    if isinstance(authors, dict):
-                        authors = authors.get('value', [])
-                    if not isinstance(authors, list):
-                        authors = []
-                    
-                    note_id = note.get('id', '')
-                    
-                    paper = Paper(
-                        title=title,
-                        abstract=abstract,
-                        url=f"https://openreview.net/forum?id={note_id}",
-                        pdf_url=f"https://openreview.net/pdf?id={note_id}",
-                        authors=authors,
-                        published=published_date,
-                        source="OpenReview"
-                    )
-                    papers.append(paper)
+            # 提取日期 (V2 API格式)
+            cdate = note.get('cdate', 0)
+            if cdate:
+                published_date = datetime.fromtimestamp(cdate / 1000).strftime('%Y-%m-%d')
             else:
-                print(f"OpenReview API响应错误: {response.status_code}")
-                    
-        except Exception as e:
-            print(f"OpenReview搜索出错: {str(e)}")
+                published_date = None
+            
+            # 检查日期范围
+            if published_date:
+                if start_date and published_date < start_date:
+                    continue
+                if end_date and published_date > end_date:
+                    continue
+            
+            title = _v(content.get('title'))
+            if not title or title == 'No Title':
+                # 跳过没有标题的论文（通常是评论或其他非正式内容）
+                continue
+            
+            # 没有摘要时尝试从其他字段获取
+            abstract = _v(content.get('abstract')) or _v(content.get('summary')) or 'No Abstract'
+            
+            authors = _v(content.get('authors'))
+            if not isinstance(authors, list):
+                authors = []
             
+            note_id = note.get('id', '')
+            
+            paper = Paper(
+                title=title,
+                abstract=abstract,
+                url=f"https://openreview.net/forum?id={note_id}",
+                pdf_url=f"https://openreview.net/pdf?id={note_id}",
+                authors=authors,
+                published=published_date,
+                source="OpenReview"
+            )
+            papers.append(paper)
+        
         return papers
 
 
+class RequestThrottle:
+    """站点请求间隔控制（线程安全）：请求前只等待距上次请求的剩余时间"""
+    
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval: 两次请求之间的最小间隔（秒）
+        """
+        self.interval = interval
+        self.last = 0.0
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        """在发起请求前调用，必要时等待"""
+        with self.lock:
+            elapsed = time.monotonic() - self.last
+            if elapsed < self.interval:
+                time.sleep(self.interval - elapsed)
+            self.last = time.monotonic()
+
+
+# 点击所有被截断的摘要以展开，返回点击的数量
+_EXPAND_ABSTRACTS_JS = """
+let clicked = 0;
+document.querySelectorAll('.gs_rs').forEach(e => {
+    if (e.innerText.includes('...')) {
+        e.click();
+        clicked++;
+    }
+});
+return clicked;
+"""
+
+# Google Scholar结果页，以及访问它使用的代理（浏览器和直接请求共用，不需要代理时设为None）
+_SCHOLAR_SEARCH_URL = "https://scholar.google.com/scholar"
+_SCHOLAR_PROXY = "http://127.0.0.1:7890"
+# 结果列表容器的id，没有命中的查询也有，用于区分“确实没有结果”和“不是结果页”
+_SCHOLAR_RESULTS_MARKER = 'id="gs_res_ccl'
+# 直接请求Scholar不自动重试：被限流时立即交给浏览器处理，避免按Retry-After长时间等待
+_scholar_session = create_session(pool_connections=1, pool_maxsize=4, retries=0)
+
+# 无头模式下屏蔽的页面资源（结果解析只需要HTML）
+_BLOCKED_RESOURCE_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.ico', '*.css', '*.woff', '*.woff2', '*.ttf']
+
+# Google Scholar的请求限流（所有搜索共享）：每分钟最多10次，允许3次突发；
+# 验证未通过时冷却15分钟
+_SCHOLAR_BLOCK_SECONDS = 15 * 60
+_scholar_bucket = RateLimiter(
+    rate=10 / 60,
+    capacity=3,
+    state_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scholar_throttle.json')
+)
+
+# ChromeDriverManager返回的驱动路径缓存，有效期内不再联网校验驱动版本
+_DRIVER_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chromedriver.json')
+_DRIVER_CACHE_TTL = 7 * 24 * 3600
+# 各平台Chrome可执行文件（Windows从注册表读取版本）
+_CHROME_BINARIES = (
+    'google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+    '/Applications/Chromium.app/Contents/MacOS/Chromium',
+)
+
+
+def _chrome_major_version() -> Optional[str]:
+    """获取本机Chrome的主版本号，无法获取时返回None"""
+    if sys.platform == 'win32':
+        import winreg
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(root, r'Software\Google\Chrome\BLBeacon') as key:
+                    version = winreg.QueryValueEx(key, 'version')[0]
+            except OSError:
+                continue
+            return version.split('.')[0]
+        return None
+    
+    for binary in _CHROME_BINARIES:
+        try:
+            output = subprocess.check_output(
+                [binary, '--version'], stderr=subprocess.DEVNULL, timeout=5
+            ).decode('utf-8', 'ignore')
+        except Exception:
+            continue
+        match = re.search(r'(\d+)\.', output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _load_cached_driver_path(chrome_ver: Optional[str]) -> Optional[str]:
+    """
+    读取缓存的ChromeDriver路径
+    
+    Args:
+        chrome_ver: 当前Chrome主版本号
+    
+    Returns:
+        缓存未过期、Chrome版本一致且驱动文件仍存在时返回路径，否则返回None
+        （无法获取Chrome版本时无从判断驱动是否匹配，不使用缓存）
+    """
+    if not chrome_ver or not os.path.exists(_DRIVER_CACHE_FILE):
+        return None
+    try:
+        with open(_DRIVER_CACHE_FILE, 'rb') as f:
+            cached = json_utils.loads(f.read())
+    except Exception as e:
+        print(f"读取ChromeDriver缓存失败: {e}")
+        return None
+    path = cached.get('path')
+    if (not path or time.time() - cached.get('ts', 0) > _DRIVER_CACHE_TTL
+            or cached.get('chrome_ver') != chrome_ver or not os.path.exists(path)):
+        return None
+    return path
+
+
+def _save_cached_driver_path(path: str, chrome_ver: Optional[str]):
+    """保存ChromeDriver路径及对应的Chrome主版本号（版本未知时不保存）"""
+    if not chrome_ver:
+        return
+    try:
+        with open(_DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            f.write(json_utils.dumps({'path': path, 'ts': time.time(), 'chrome_ver': chrome_ver}))
+    except Exception as e:
+        print(f"保存ChromeDriver缓存失败: {e}")
+
+
+def _discard_cached_driver_path():
+    """删除ChromeDriver路径缓存（缓存的驱动无法启动时调用，下次重新安装）"""
+    try:
+        os.remove(_DRIVER_CACHE_FILE)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"删除ChromeDriver缓存失败: {e}")
+
+
+# 检查Scholar结果PDF链接时的并发请求数
+_PDF_CHECK_CONCURRENCY = 10
+
+# arXiv API要求两次请求至少间隔3秒（搜索翻页与摘要补全共用）
+_arxiv_throttle = RequestThrottle(interval=3.0)
+
+
 class GoogleScholarSearchEngine(SearchEngine):
-    """Google Scholar搜索引擎（Selenium优先，带重试机制）"""
+    """Google Scholar搜索引擎（直接请求优先，Selenium兜底）"""
+    
+    name = "Google Scholar"
+    
+    # ChromeDriverManager().install() 的结果，进程内只检查一次（安装失败时为空字符串）
+    _driver_path = None
     
     def __init__(self):
         super().__init__()
@@ -230,88 +654,305 @@ class GoogleScholarSearchEngine(SearchEngine):
             'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
         ]
         self.use_selenium = SELENIUM_AVAILABLE
+        
+        # 浏览器实例在多次搜索间复用，仅在会话失效时重建
+        self._driver = None
+        # 同一浏览器不能同时执行两次搜索
+        self._driver_lock = threading.Lock()
+        atexit.register(self._reset_driver)
     
-    def search(self, keywords: str, start_date: Optional[str] = None, 
-               end_date: Optional[str] = None) -> List[Paper]:
-        """搜索论文（优先使用Selenium）"""
-        papers = []
+    def _do_search(self, keywords: str, start_date: Optional[str] = None, 
+                   end_date: Optional[str] = None) -> List[Paper]:
+        """
+        搜索论文（优先直接请求结果页，被拦截或请求失败时使用Selenium）
         
-        # 优先使用Selenium
-        if self.use_selenium and SELENIUM_AVAILABLE:
-            print("🚀 使用Selenium浏览器模拟搜索...")
-            papers = self._search_with_selenium(keywords, start_date, end_date)
-            if papers:
+        Raises:
+            SearchError: 被拦截且Selenium不可用、浏览器搜索失败或处于冷却期
+        """
+        try:
+            papers = self._search_with_http(keywords, start_date, end_date)
+            if papers is not None:
+                # 正常的结果页（包括确实没有结果的查询）无需再启动浏览器
                 return papers
-            print("⚠️ Selenium搜索失败")
-        else:
-            print("⚠️ Selenium不可用，请安装: pip install selenium webdriver-manager")
-            print("💡 或者使用ArXiv和OpenReview作为替代数据源")
+            
+            if not (self.use_selenium and SELENIUM_AVAILABLE):
+                print("⚠️ Selenium不可用，请安装: pip install selenium webdriver-manager")
+                print("💡 或者使用ArXiv和OpenReview作为替代数据源")
+                raise SearchError("Google Scholar直接请求被拦截，且Selenium不可用")
+            
+            print("🚀 使用Selenium浏览器模拟搜索...")
+            with self._driver_lock:
+                html = self._fetch_with_selenium(keywords, start_date, end_date)
+            if html is None:
+                raise SearchError("Google Scholar浏览器搜索失败")
+            # 解析、补全摘要和检查PDF链接不占用浏览器，释放锁后再进行，下一次搜索可以立即开始翻页
+            papers = self._parse_results(html)
+            if not papers and _SCHOLAR_RESULTS_MARKER not in html:
+                # 页面未加载出结果列表（空结果会被缓存，不能把失败当作没有结果）
+                raise SearchError("Google Scholar浏览器未能加载结果页")
+            return papers
+        except RateLimitedError as e:
+            raise SearchError(f"Google Scholar {str(e)}") from e
+    
+    def _search_params(self, keywords: str, start_date: Optional[str],
+                       end_date: Optional[str]) -> Dict[str, str]:
+        """Google Scholar结果页的查询参数"""
+        params = {'q': keywords, 'hl': 'zh-CN', 'num': str(min(20, self.max_results))}
+        if start_date:
+            params['as_ylo'] = start_date[:4]
+        if end_date:
+            params['as_yhi'] = end_date[:4]
+        return params
+    
+    def _search_with_http(self, keywords: str, start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> Optional[List[Paper]]:
+        """
+        直接请求结果页并解析（结果页由服务端渲染，无需启动浏览器）
+        
+        Args:
+            keywords: 搜索关键词
+            start_date: 开始日期 (YYYY-MM-DD)
+            end_date: 结束日期 (YYYY-MM-DD)
+            
+        Returns:
+            论文列表（查询确实没有结果时为空列表），被拦截或请求失败时为None
+            
+        Raises:
+            RateLimitedError: 处于冷却期
+        """
+        _scholar_bucket.acquire()
+        print("🌐 直接请求Google Scholar结果页...")
+        try:
+            response = _scholar_session.get(
+                _SCHOLAR_SEARCH_URL,
+                params=self._search_params(keywords, start_date, end_date),
+                headers={
+                    'User-Agent': random.choice(self.user_agents),
+                    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'
+                },
+                proxies={'http': _SCHOLAR_PROXY, 'https': _SCHOLAR_PROXY} if _SCHOLAR_PROXY else None,
+                timeout=15
+            )
+        except Exception as e:
+            print(f"⚠️ 直接请求失败: {str(e)}")
+            return None
+        
+        # 被重定向到验证页或被限流时交给浏览器处理（可以手动完成验证）
+        text = response.text
+        if (response.status_code != 200 or '/sorry/' in response.url
+                or 'gs_captcha' in text or 'unusual traffic' in text):
+            print(f"⚠️ 直接请求被拦截 (HTTP {response.status_code})")
+            return None
         
+        papers = self._parse_results(text)
+        if not papers and _SCHOLAR_RESULTS_MARKER not in text:
+            # 没有结果列表容器，不是正常的结果页（如Cookie同意页），交给浏览器处理
+            print("⚠️ 直接请求返回的不是结果页")
+            return None
         return papers
     
-    def _search_with_selenium(self, keywords: str, 
-                             start_date: Optional[str] = None,
-                             end_date: Optional[str] = None) -> List[Paper]:
-        """使用Selenium模拟浏览器搜索"""
-        papers = []
-        driver = None
+    def _build_options(self, headless: bool):
+        """
+        构建Chrome选项（每次创建浏览器时重新随机选择User-Agent）
+        
+        Args:
+            headless: 是否使用无头模式
+            
+        Returns:
+            Chrome选项
+        """
+        chrome_options = Options()
+        # 默认使用可视化浏览器，便于手动完成验证码
+        if headless:
+            chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--no-sandbox')
+        chrome_options.add_argument('--disable-dev-shm-usage')
+        chrome_options.add_argument('--disable-gpu')
+        chrome_options.add_argument('--disable-software-rasterizer')
+        for arg in ('--disable-extensions', '--disable-plugins', '--disable-background-networking',
+                    '--disable-sync', '--no-first-run', '--disable-default-apps'):
+            chrome_options.add_argument(arg)
+        prefs = {'profile.default_content_setting_values.notifications': 2}
+        if headless:
+            # 无头模式下不需要人工看验证码，不加载图片、样式和字体
+            prefs['profile.managed_default_content_settings.images'] = 2
+            prefs['profile.managed_default_content_settings.stylesheets'] = 2
+            prefs['profile.managed_default_content_settings.fonts'] = 2
+            chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', prefs)
+        # DOM解析完成即返回，不等图片等子资源；结果由WebDriverWait等待
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument(f'user-agent={random.choice(self.user_agents)}')
         
+        # 反检测设置
+        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        
+        # 代理设置
+        if _SCHOLAR_PROXY:
+            chrome_options.add_argument(f'--proxy-server={_SCHOLAR_PROXY}')
+        return chrome_options
+    
+    def _create_driver(self):
+        """创建并配置Chrome浏览器"""
+        print("📦 正在初始化浏览器...")
+        
+        # 配置Chrome选项
+        headless = Config.SELENIUM_HEADLESS
+        chrome_options = self._build_options(headless)
+        
+        # 初始化浏览器
+        cls = type(self)
         try:
-            print("📦 正在初始化浏览器...")
-            
-            # 配置Chrome选项
-            chrome_options = Options()
-            # chrome_options.add_argument('--headless=new')  # 注释掉无头模式，启用可视化浏览器
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--disable-software-rasterizer')
-            chrome_options.add_argument(f'user-agent={random.choice(self.user_agents)}')
-            
-            # 反检测设置
-            chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # 代理设置（如果需要，取消注释）
-            chrome_options.add_argument('--proxy-server=http://127.0.0.1:7890')
-            
-            # 初始化浏览器
+            if cls._driver_path is None:
+                cls._driver_path = self._install_driver()
+            if not cls._driver_path:
+                raise RuntimeError("ChromeDriverManager此前安装失败")
+            service = Service(cls._driver_path)
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception as e:
+            print(f"⚠️ ChromeDriver初始化失败: {str(e)}")
+            print("💡 尝试使用系统Chrome...")
+            if cls._driver_path is None:
+                # 安装失败也只尝试一次，之后直接使用系统Chrome
+                cls._driver_path = ''
+            elif cls._driver_path:
+                # 驱动无法启动（可能是过期的缓存路径）：删除缓存，下次创建浏览器时重新安装
+                _discard_cached_driver_path()
+                cls._driver_path = None
+            driver = webdriver.Chrome(options=chrome_options)
+        
+        # 设置脚本防止被检测为自动化
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+            'source': '''
+                Object.defineProperty(navigator, 'webdriver', {
+                    get: () => undefined
+                })
+            '''
+        })
+        
+        if headless:
+            # 解析结果只需要HTML，直接跳过图片、样式和字体的请求
             try:
-                service = Service(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=chrome_options)
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': _BLOCKED_RESOURCE_URLS})
             except Exception as e:
-                print(f"⚠️ ChromeDriver初始化失败: {str(e)}")
-                print("💡 尝试使用系统Chrome...")
-                driver = webdriver.Chrome(options=chrome_options)
-            
-            # 设置脚本防止被检测为自动化
-            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
-                'source': '''
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    })
-                '''
-            })
+                print(f"⚠️ 无法屏蔽页面资源: {str(e)}")
+        
+        driver.set_page_load_timeout(30)
+        return driver
+    
+    @staticmethod
+    def _install_driver() -> str:
+        """获取ChromeDriver路径：优先使用未过期的本地缓存，否则通过ChromeDriverManager安装"""
+        chrome_ver = _chrome_major_version()
+        path = _load_cached_driver_path(chrome_ver)
+        if path:
+            return path
+        path = ChromeDriverManager().install()
+        _save_cached_driver_path(path, chrome_ver)
+        return path
+    
+    def _get_driver(self):
+        """
+        获取可用的浏览器实例（首次调用或会话失效时重新创建）
+        
+        Returns:
+            WebDriver实例
+        """
+        if self._driver is not None:
+            try:
+                # 访问窗口句柄以确认浏览器会话仍然有效
+                self._driver.window_handles
+                return self._driver
+            except WebDriverException:
+                print("⚠️ 浏览器会话已失效，重新创建...")
+                self._reset_driver()
+        
+        self._driver = self._create_driver()
+        return self._driver
+    
+    def _reset_driver(self):
+        """关闭并丢弃当前浏览器实例"""
+        driver, self._driver = self._driver, None
+        if driver:
+            try:
+                driver.quit()
+            except:
+                pass
+    
+    def _wait_until_verified(self, driver, verified, timeout: int = 120) -> bool:
+        """
+        等待用户在浏览器中手动完成验证
+        
+        Args:
+            driver: WebDriver实例
+            verified: 判断验证是否完成的条件，参数为driver
+            timeout: 最长等待时间（秒）
             
-            driver.set_page_load_timeout(30)
+        Returns:
+            是否在超时前完成验证
+        """
+        if Config.SELENIUM_HEADLESS:
+            print("⚠️ 无头模式下无法手动完成验证，请关闭 SELENIUM_HEADLESS 后重试")
+            return False
+        
+        try:
+            WebDriverWait(
+                driver, timeout, poll_frequency=1, ignored_exceptions=(WebDriverException,)
+            ).until(verified)
+        except TimeoutException:
+            print("⏰ 验证超时，请稍后重试")
+            return False
+        print("✅ 验证成功！继续搜索...")
+        return True
+    
+    def _block(self):
+        """
+        验证未通过：Google Scholar进入冷却期，并丢弃已被标记的浏览器（冷却后换新的User-Agent和Cookie）
+        
+        Raises:
+            RateLimitedError: 总是抛出
+        """
+        self._reset_driver()
+        _scholar_bucket.block(_SCHOLAR_BLOCK_SECONDS)
+        raise RateLimitedError(_SCHOLAR_BLOCK_SECONDS)
+    
+    def _fetch_with_selenium(self, keywords: str, 
+                            start_date: Optional[str] = None,
+                            end_date: Optional[str] = None) -> Optional[str]:
+        """
+        使用Selenium模拟浏览器打开结果页（复用同一浏览器实例）
+        
+        Returns:
+            展开摘要后的页面HTML，出错时返回None
+        
+        Raises:
+            RateLimitedError: 处于冷却期或验证未通过
+        """
+        try:
+            # 限流（处于冷却期时直接抛出RateLimitedError，不启动浏览器）
+            _scholar_bucket.acquire()
+            driver = self._get_driver()
             
             # 构建URL
-            query = keywords.replace(" ", "+")
-            url = f"https://scholar.google.com/scholar?q={query}&hl=zh-CN&num={min(20, self.max_results)}"
-            
-            if start_date:
-                url += f"&as_ylo={start_date[:4]}"
-            if end_date:
-                url += f"&as_yhi={end_date[:4]}"
+            url = f"{_SCHOLAR_SEARCH_URL}?{urlencode(self._search_params(keywords, start_date, end_date))}"
             
             print(f"🔍 正在访问: {url[:80]}...")
             
             # 访问页面
             driver.get(url)
             
-            # 等待页面加载
-            time.sleep(random.uniform(3, 5))
+            # 等待搜索结果或验证码出现（一出现即继续，超时后按当前页面处理）
+            try:
+                WebDriverWait(driver, 10).until(EC.any_of(
+                    EC.presence_of_element_located((By.CLASS_NAME, 'gs_ri')),
+                    EC.presence_of_element_located((By.ID, 'gs_captcha_ccl')),
+                    EC.presence_of_element_located((By.ID, 'recaptcha'))
+                ))
+            except TimeoutException:
+                pass
             
             # 检查是否被拦截
             page_source = driver.page_source.lower()
@@ -321,30 +962,15 @@ class GoogleScholarSearchEngine(SearchEngine):
                 print("🌐 浏览器窗口已打开，请手动完成验证...")
                 print("⏳ 等待用户完成验证（最多120秒）...")
                 
-                # 等待用户完成验证（检查URL是否改变或页面内容是否改变）
-                max_wait = 120  # 最多等待120秒
-                start_time = time.time()
-                verified = False
+                # 等待用户完成验证（验证页面消失且出现搜索结果，最多120秒）
+                if not self._wait_until_verified(
+                    driver,
+                    lambda d: 'sorry' not in d.page_source.lower()
+                    and 'unusual traffic' not in d.page_source.lower()
+                    and 'scholar' in d.current_url and 'gs_ri' in d.page_source
+                ):
+                    self._block()
                 
-                while time.time() - start_time < max_wait:
-                    try:
-                        current_source = driver.page_source.lower()
-                        # 检查是否已经通过验证（验证页面消失）
-                        if 'sorry' not in current_source and 'unusual traffic' not in current_source:
-                            if 'scholar' in driver.current_url and 'gs_ri' in driver.page_source:
-                                print("✅ 验证成功！继续搜索...")
-                                verified = True
-                                break
-                        time.sleep(2)  # 每2秒检查一次
-                    except:
-                        pass
-                
-                if not verified:
-                    print("⏰ 验证超时，请稍后重试")
-                    return papers
-                
-                # 验证成功后重新获取页面内容
-                time.sleep(2)
                 page_source = driver.page_source.lower()
             
             if 'captcha' in page_source and 'gs_ri' not in driver.page_source:
@@ -352,177 +978,179 @@ class GoogleScholarSearchEngine(SearchEngine):
                 print("🌐 浏览器窗口已打开，请手动完成验证...")
                 print("⏳ 等待用户完成验证（最多120秒）...")
                 
-                # 等待验证码完成
-                max_wait = 120
-                start_time = time.time()
-                verified = False
-                
-                while time.time() - start_time < max_wait:
-                    try:
-                        current_source = driver.page_source.lower()
-                        # 检查是否已有搜索结果
-                        if 'gs_ri' in driver.page_source and 'captcha' not in current_source:
-                            print("✅ 验证成功！继续搜索...")
-                            verified = True
-                            break
-                        time.sleep(2)
-                    except:
-                        pass
-                
-                if not verified:
-                    print("⏰ 验证超时，请稍后重试")
-                    return papers
-                
-                # 验证成功后重新获取页面内容
-                time.sleep(2)
-            
-            # 获取页面源码
-            html = driver.page_source
-            soup = BeautifulSoup(html, 'html.parser')
+                # 等待验证码完成（出现搜索结果且验证码消失）
+                if not self._wait_until_verified(
+                    driver,
+                    lambda d: 'gs_ri' in d.page_source and 'captcha' not in d.page_source.lower()
+                ):
+                    self._block()
             
             # 尝试点击"更多"按钮展开所有摘要
             try:
-                # 查找并点击所有"显示更多"按钮
-                show_more_buttons = driver.find_elements(By.CLASS_NAME, 'gs_rs')
-                for button_elem in show_more_buttons[:5]:  # 只展开前5个避免超时
-                    try:
-                        # 检查是否有"..."表示被截断
-                        if '...' in button_elem.text:
-                            # 尝试点击展开
-                            driver.execute_script("arguments[0].click();", button_elem)
-                            time.sleep(0.5)
-                    except:
-                        pass
+                # 在浏览器中一次性点击所有被截断（含"..."）的摘要，避免逐个元素往返
+                clicked = driver.execute_script(_EXPAND_ABSTRACTS_JS)
                 
-                # 重新获取页面内容
-                time.sleep(1)
-                html = driver.page_source
-                soup = BeautifulSoup(html, 'html.parser')
+                # 等待展开的内容渲染
+                if clicked:
+                    time.sleep(0.3)
             except Exception as e:
                 print(f"  ℹ️ 无法展开摘要: {str(e)}")
             
-            # 解析结果
-            results = soup.find_all(class_="gs_ri")
-            
-            if not results:
-                print("⚠️ 未找到搜索结果")
-                # 保存HTML用于调试
-                # with open('debug_scholar.html', 'w', encoding='utf-8') as f:
-                #     f.write(html)
-                return papers
-            
-            print(f"📄 找到 {len(results)} 个搜索结果，开始解析...")
-            
-            for idx, result in enumerate(results[:min(len(results), self.max_results)], 1):
-                try:
-                    title_elem = result.find('h3')
-                    if not title_elem:
-                        continue
-                    
-                    paper = Paper(
-                        title="",
-                        abstract="",
-                        url="",
-                        pdf_url=None,
-                        authors=[],
-                        published=None,
-                        source="Google Scholar"
-                    )
-                    
-                    # 标题
-                    paper.title = title_elem.get_text().strip()
-                    paper.title = paper.title.replace('[HTML]', '').replace('[PDF]', '').replace('[图书]', '').strip()
-                    
-                    # 链接
-                    link = title_elem.find('a')
-                    if link and link.has_attr('href'):
-                        paper.url = link.get('href')
-                    
-                    # 摘要 - 获取完整摘要（包括被隐藏的部分）
-                    abstract_elem = result.find(class_="gs_rs")
-                    if abstract_elem:
-                        # 获取所有文本，包括可能被折叠的内容
-                        full_abstract = abstract_elem.get_text(separator=' ', strip=True)
-                        paper.abstract = full_abstract
-                        
-                        # 如果摘要以"..."结尾，说明被截断了
-                        if paper.abstract.endswith('...') or len(paper.abstract) < 150:
-                            # 对于arXiv论文，直接从arXiv获取完整摘要
-                            if paper.url and 'arxiv.org' in paper.url:
-                                print(f"  🔄 论文{idx}摘要被截断，从arXiv获取完整版...")
-                                enhanced_abstract = self._fetch_full_abstract(paper.url, driver)
-                                if enhanced_abstract and len(enhanced_abstract) > len(paper.abstract):
-                                    paper.abstract = enhanced_abstract
-                                    print(f"  ✅ 获取到完整摘要: {len(paper.abstract)} 字符")
-                        
-                        print(f"  📝 论文{idx}摘要: {paper.abstract[:100]}{'...' if len(paper.abstract) > 100 else ''}")
-                    else:
-                        paper.abstract = "摘要不可用"
-                    
-                    # 作者和出版信息
-                    authors_elem = result.find(class_="gs_a")
-                    if authors_elem:
-                        author_info = authors_elem.get_text().strip()
-                        paper.published = author_info
-                        # 尝试提取作者名称
-                        if ' - ' in author_info:
-                            authors_part = author_info.split(' - ')[0]
-                            paper.authors = [a.strip() for a in authors_part.split(',')]
-                    
-                    # 提取PDF链接 - 改进策略
-                    # 1. 首先查找右侧的PDF链接（通常在gs_or_ggsm类中）
-                    pdf_link_elem = result.find_parent(class_='gs_r').find(class_='gs_or_ggsm') if result.find_parent(class_='gs_r') else None
-                    if pdf_link_elem:
-                        pdf_a = pdf_link_elem.find('a', href=True)
-                        if pdf_a and pdf_a.get('href'):
-                            href = pdf_a.get('href')
-                            if href.startswith('http'):
-                                paper.pdf_url = href
-                    
-                    # 2. 如果没找到，尝试在结果中查找所有包含PDF的链接
-                    if not paper.pdf_url:
-                        all_links = result.find_parent(class_='gs_r').find_all('a', href=True) if result.find_parent(class_='gs_r') else result.find_all('a', href=True)
-                        for link_elem in all_links:
-                            href = link_elem.get('href', '')
-                            link_text = link_elem.get_text().lower()
-                            # 查找明确标注为PDF的链接
-                            if ('[pdf]' in link_text or 'pdf' in link_text) and href.startswith('http'):
-                                paper.pdf_url = href
-                                break
-                            # 或者链接直接指向PDF文件
-                            elif '.pdf' in href.lower() and href.startswith('http'):
-                                paper.pdf_url = href
-                                break
-                    
-                    # 3. 智能PDF查找：如果论文URL是arXiv、Semantic Scholar等，尝试构建PDF链接
-                    if not paper.pdf_url and paper.url:
-                        paper.pdf_url = self._try_construct_pdf_url(paper.url)
-                    
-                    # 调试信息
-                    pdf_status = "✅" if paper.pdf_url else "❌"
-                    print(f"  {pdf_status} 论文{idx}: {paper.title[:50]}...")
-                    
-                    papers.append(paper)
-                    
-                except Exception as e:
-                    print(f"⚠️ 解析第{idx}篇论文时出错: {str(e)}")
-                    continue
-            
-            if papers:
-                print(f"✅ 成功获取 {len(papers)} 篇论文")
-            else:
-                print("⚠️ 未能解析出任何论文")
+            # 展开后只获取一次页面源码
+            return driver.page_source
             
+        except RateLimitedError:
+            raise
         except Exception as e:
             print(f"⚠️ Selenium搜索出错: {str(e)}")
             import traceback
             traceback.print_exc()
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
+            # 浏览器本身出错时丢弃实例，下次搜索重新创建
+            if isinstance(e, WebDriverException):
+                self._reset_driver()
+        
+        return None
+    
+    def _parse_results(self, html: str) -> List[Paper]:
+        """
+        解析Google Scholar搜索结果页
+        
+        Args:
+            html: 结果页HTML
+            
+        Returns:
+            论文列表
+        """
+        from lxml import etree, html as lxml_html
+        
+        papers = []
+        # 摘要被截断的arXiv论文，解析完成后统一获取完整摘要
+        truncated = {}
+        try:
+            tree = lxml_html.fromstring(html)
+            results = _by_class('gs_ri')(tree)
+        except (etree.ParserError, ValueError):
+            results = []
+        
+        if not results:
+            print("⚠️ 未找到搜索结果")
+            # 保存HTML用于调试
+            # with open('debug_scholar.html', 'w', encoding='utf-8') as f:
+            #     f.write(html)
+            return papers
+        
+        print(f"📄 找到 {len(results)} 个搜索结果，开始解析...")
+        
+        for idx, result in enumerate(results[:self.max_results], 1):
+            try:
+                title_elem = _first(_xpath('.//h3')(result))
+                if title_elem is None:
+                    continue
+                
+                paper = Paper(
+                    title="",
+                    abstract="",
+                    url="",
+                    pdf_url=None,
+                    authors=[],
+                    published=None,
+                    source="Google Scholar"
+                )
+                
+                # 标题（去掉[PDF]、[图书]等类型标记）
+                paper.title = _TITLE_TAG_RE.sub('', title_elem.text_content()).strip()
+                
+                # 链接
+                link = _first(_xpath('.//a[@href]')(title_elem))
+                if link is not None:
+                    paper.url = link.get('href')
+                
+                # 摘要 - 获取完整摘要（包括被隐藏的部分）
+                abstract_elem = _first(_by_class('gs_rs')(result))
+                if abstract_elem is not None:
+                    # 获取所有文本，包括可能被折叠的内容
+                    full_abstract = ' '.join(
+                        text.strip() for text in abstract_elem.itertext() if text.strip()
+                    )
+                    paper.abstract = full_abstract
+                    
+                    # 如果摘要以"..."结尾，说明被截断了
+                    if paper.abstract.endswith('...') or len(paper.abstract) < 150:
+                        # 对于arXiv论文，直接从arXiv获取完整摘要
+                        arxiv_id = _extract_arxiv_id(paper.url)
+                        if arxiv_id:
+                            truncated.setdefault(arxiv_id, []).append(paper)
+                    
+                    logger.debug("  📝 论文%d摘要: %.100s%s", idx, paper.abstract, '...' if len(paper.abstract) > 100 else '')
+                else:
+                    paper.abstract = "摘要不可用"
+                
+                # 作者和出版信息
+                authors_elem = _first(_by_class('gs_a')(result))
+                if authors_elem is not None:
+                    author_info = authors_elem.text_content().strip()
+                    paper.published = author_info
+                    # 尝试提取作者名称
+                    if ' - ' in author_info:
+                        authors_part = author_info.split(' - ')[0]
+                        paper.authors = [a.strip() for a in authors_part.split(',')]
+                
+                # 提取PDF链接 - 改进策略
+                # 所在的整条结果（gs_r），只向上查找一次
+                parent = _first(_by_class('gs_r', 'ancestor::')(result))
+                
+                # 1. 首先查找右侧的PDF链接（通常在gs_or_ggsm类中）
+                pdf_link_elem = _first(_by_class('gs_or_ggsm')(parent)) if parent is not None else None
+                if pdf_link_elem is not None:
+                    pdf_a = _first(_xpath('.//a[@href]')(pdf_link_elem))
+                    if pdf_a is not None and pdf_a.get('href'):
+                        href = pdf_a.get('href')
+                        if href.startswith('http'):
+                            paper.pdf_url = href
+                
+                # 2. 如果没找到，尝试在结果中查找所有包含PDF的链接
+                if not paper.pdf_url:
+                    all_links = _xpath('.//a[@href]')(parent if parent is not None else result)
+                    for link_elem in all_links:
+                        href = link_elem.get('href', '')
+                        link_text = link_elem.text_content().lower()
+                        # 查找明确标注为PDF的链接
+                        if ('[pdf]' in link_text or 'pdf' in link_text) and href.startswith('http'):
+                            paper.pdf_url = href
+                            break
+                        # 或者链接直接指向PDF文件
+                        elif '.pdf' in href.lower() and href.startswith('http'):
+                            paper.pdf_url = href
+                            break
+                
+                # 3. 智能PDF查找：如果论文URL是arXiv、Semantic Scholar等，尝试构建PDF链接
+                if not paper.pdf_url and paper.url:
+                    paper.pdf_url = self._try_construct_pdf_url(paper.url)
+                
+                # 调试信息
+                logger.debug("  %s 论文%d: %.50s...", "✅" if paper.pdf_url else "❌", idx, paper.title)
+                
+                papers.append(paper)
+                
+            except Exception as e:
+                print(f"⚠️ 解析第{idx}篇论文时出错: {str(e)}")
+                continue
+        
+        if truncated:
+            print(f"  🔄 {len(truncated)} 篇论文摘要被截断，从arXiv批量获取完整版...")
+            abstracts = self._fetch_arxiv_abstracts(list(truncated))
+            for arxiv_id, abstract in abstracts.items():
+                for paper in truncated.get(arxiv_id, []):
+                    if len(abstract) > len(paper.abstract):
+                        paper.abstract = abstract
+            print(f"  ✅ 获取到 {len(abstracts)} 篇完整摘要")
+        
+        self._verify_pdf_urls(papers)
+        
+        if papers:
+            print(f"✅ 成功获取 {len(papers)} 篇论文")
+        else:
+            print("⚠️ 未能解析出任何论文")
         
         return papers
     
@@ -556,90 +1184,187 @@ class GoogleScholarSearchEngine(SearchEngine):
         
         return None
     
-    def _fetch_full_abstract(self, url: str, driver) -> Optional[str]:
-        """从论文原始页面获取完整摘要"""
-        if not url or not url.startswith('http'):
-            return None
+    def _verify_pdf_urls(self, papers: List[Paper]):
+        """
+        并发发送HEAD请求检查PDF链接，确定不存在的链接置为None
         
-        try:
-            # 对于arXiv链接，使用特殊处理
-            if 'arxiv.org/abs/' in url:
-                current_window = driver.current_window_handle
-                driver.execute_script("window.open('');")
-                driver.switch_to.window(driver.window_handles[-1])
-                
-                try:
-                    driver.get(url)
-                    time.sleep(2)
-                    
-                    # arXiv的摘要在blockquote.abstract元素中
-                    soup = BeautifulSoup(driver.page_source, 'html.parser')
-                    abstract_elem = soup.find('blockquote', class_='abstract')
-                    if abstract_elem:
-                        # 移除"Abstract:"标签
-                        abstract_text = abstract_elem.get_text(strip=True)
-                        abstract_text = abstract_text.replace('Abstract:', '').strip()
-                        return abstract_text
-                finally:
-                    driver.close()
-                    driver.switch_to.window(current_window)
-            
-            # 对于其他链接，尝试通用方法（限制避免过度请求）
-            # 这里我们暂时不处理，避免打开太多页面影响性能
-            
-        except Exception as e:
-            print(f"    ⚠️ 获取完整摘要失败: {str(e)}")
+        Args:
+            papers: 论文列表（原地修改pdf_url）
+        """
+        candidates = [paper for paper in papers if paper.pdf_url]
+        if not candidates:
+            return
         
-        return None
+        headers = {'User-Agent': random.choice(self.user_agents)}
+        
+        def check(url):
+            """返回链接是否可能有效：仅4xx视为无效，不支持HEAD(405)、限流(429)和网络错误时保留"""
+            try:
+                response = session.head(url, headers=headers, allow_redirects=True, timeout=5)
+            except Exception:
+                return True
+            return not (400 <= response.status_code < 500 and response.status_code not in (405, 429))
+        
+        with ThreadPoolExecutor(max_workers=min(len(candidates), _PDF_CHECK_CONCURRENCY)) as executor:
+            valid = list(executor.map(check, [paper.pdf_url for paper in candidates]))
+        
+        invalid = 0
+        for paper, ok in zip(candidates, valid):
+            if not ok:
+                paper.pdf_url = None
+                invalid += 1
+        if invalid:
+            print(f"  ❌ {invalid} 个PDF链接无法访问，已移除")
+    
+    def _fetch_arxiv_abstracts(self, arxiv_ids: List[str]) -> Dict[str, str]:
+        """
+        通过arXiv API批量获取完整摘要（每次请求最多100篇）
+        
+        Args:
+            arxiv_ids: 不含版本号的arXiv ID列表
+            
+        Returns:
+            arXiv ID到完整摘要的映射，获取失败的ID不包含在内
+        """
+        abstracts = {}
+        for start in range(0, len(arxiv_ids), 100):
+            batch = arxiv_ids[start:start + 100]
+            try:
+                _arxiv_throttle.wait()
+                response = session.get(
+                    _ARXIV_API_URL,
+                    params={'id_list': ','.join(batch), 'max_results': len(batch)},
+                    timeout=30
+                )
+                response.raise_for_status()
+                root = ElementTree.fromstring(response.content)
+                for entry in root.iterfind(_ATOM_ENTRY):
+                    arxiv_id = _extract_arxiv_id(entry.findtext(_ATOM_ID, ''))
+                    summary = entry.findtext(_ATOM_SUMMARY, '')
+                    if arxiv_id and summary:
+                        abstracts[arxiv_id] = ' '.join(summary.split())
+            except Exception as e:
+                print(f"    ⚠️ 获取完整摘要失败: {str(e)}")
+        return abstracts
 
 
 class SearchManager:
     """搜索管理器，统一管理多个搜索引擎"""
     
     def __init__(self):
-        self.engines = {
-            'arxiv': ArxivSearchEngine(),
-            'openreview': OpenReviewSearchEngine(),
-            'google_scholar': GoogleScholarSearchEngine()
+        self.engine_classes = {
+            'arxiv': ArxivSearchEngine,
+            'openreview': OpenReviewSearchEngine,
+            'google_scholar': GoogleScholarSearchEngine
         }
+        # 搜索引擎在首次使用时才创建
+        self.engines = {}
+        self._engines_lock = threading.Lock()
     
-    def _filter_paper(self, paper: Paper, exclude_keywords: list, require_keywords: list) -> bool:
+    def get_engine(self, source: str) -> SearchEngine:
+        """
+        获取指定来源的搜索引擎（首次调用时创建）
+        
+        Args:
+            source: 来源名称
+            
+        Returns:
+            搜索引擎实例
+        """
+        with self._engines_lock:
+            if source not in self.engines:
+                self.engines[source] = self.engine_classes[source]()
+            return self.engines[source]
+    
+    @staticmethod
+    def _compile_keywords(keywords: List[str]) -> Optional[re.Pattern]:
+        """
+        将关键词列表编译为一个正则（各关键词转小写后按字面匹配，用于匹配 Paper.lc_content）
+        
+        Args:
+            keywords: 关键词列表
+            
+        Returns:
+            编译后的正则，关键词为空时返回None
+        """
+        keywords = [keyword for keyword in keywords or [] if keyword]
+        if not keywords:
+            return None
+        return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+    
+    def _filter_paper(self, paper: Paper, exclude_re: Optional[re.Pattern],
+                      require_re: Optional[re.Pattern]) -> bool:
         """智能过滤论文
         
         Args:
             paper: 论文对象
-            exclude_keywords: 排除关键词列表
-            require_keywords: 必需关键词列表
+            exclude_re: 排除关键词正则（_compile_keywords生成）
+            require_re: 必需关键词正则（_compile_keywords生成）
             
         Returns:
             True表示保留，False表示过滤掉
         """
-        # 合并标题和摘要用于检查
-        content = (paper.title + ' ' + paper.abstract).lower()
+        # 合并标题和摘要用于检查（已转小写，同一论文多次过滤时不重复计算）
+        content = paper.lc_content
         
         # 检查排除关键词
-        if exclude_keywords:
-            for keyword in exclude_keywords:
-                if keyword.lower() in content:
-                    print(f"  🚫 过滤掉: {paper.title[:60]}... (包含排除词: {keyword})")
-                    return False
+        if exclude_re:
+            match = exclude_re.search(content)
+            if match:
+                logger.debug("  🚫 过滤掉: %.60s... (包含排除词: %s)", paper.title, match.group())
+                return False
         
         # 检查必需关键词
-        if require_keywords:
-            has_required = False
-            for keyword in require_keywords:
-                if keyword.lower() in content:
-                    has_required = True
-                    break
-            if not has_required:
-                print(f"  🚫 过滤掉: {paper.title[:60]}... (缺少必需关键词)")
-                return False
+        if require_re and not require_re.search(content):
+            logger.debug("  🚫 过滤掉: %.60s... (缺少必需关键词)", paper.title)
+            return False
         
         return True
+    
+    @staticmethod
+    def _dedup_keys(paper: Paper) -> List[str]:
+        """
+        生成论文去重键：忽略大小写、标点和空白的标题（短标题附加第一作者的姓），以及arXiv ID（如有）
+        
+        Args:
+            paper: 论文对象
+            
+        Returns:
+            去重键列表，任一键相同即视为同一篇论文
+        """
+        keys = []
+        title_key = _NON_WORD_RE.sub('', paper.title.lower())[:120]
+        if title_key and len(title_key) < _SHORT_TITLE_LEN and paper.authors:
+            # 短标题（如 "Introduction"）容易撞车，加上第一作者的姓区分
+            last_name = paper.authors[0].split()[-1] if paper.authors[0].split() else ''
+            title_key += '|' + _NON_WORD_RE.sub('', last_name.lower())
+        if title_key:
+            keys.append(title_key)
+        arxiv_id = _extract_arxiv_id(paper.url) or _extract_arxiv_id(paper.pdf_url)
+        if arxiv_id:
+            keys.append('arxiv:' + arxiv_id)
+        return keys
+    
+    def _search_engine(self, source: str, keywords: str, start_date: Optional[str],
+                       end_date: Optional[str]) -> List[Paper]:
+        """
+        在单个搜索引擎上搜索（引擎在工作线程中按需创建）
+        
+        Args:
+            source: 来源名称
+            keywords: 搜索关键词
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            论文列表
+        """
+        return self.get_engine(source).search(keywords, start_date, end_date)
         
     def search_all(self, keywords: str, start_date: Optional[str] = None,
                    end_date: Optional[str] = None, sources: List[str] = None,
-                   exclude_keywords: List[str] = None, require_keywords: List[str] = None) -> List[Paper]:
+                   exclude_keywords: List[str] = None, require_keywords: List[str] = None,
+                   errors: Optional[Dict[str, str]] = None) -> List[Paper]:
         """
         在所有选定的搜索引擎上搜索
         
@@ -650,12 +1375,13 @@ class SearchManager:
             sources: 要搜索的来源列表，默认全部
             exclude_keywords: 排除关键词列表
             require_keywords: 必需关键词列表
+            errors: 传入字典时，记录搜索失败的来源及错误信息（失败的来源不计入结果）
             
         Returns:
             所有搜索结果的合并列表
         """
         if sources is None:
-            sources = list(self.engines.keys())
+            sources = list(self.engine_classes.keys())
         
         # 从Config获取过滤设置
         if exclude_keywords is None:
@@ -664,6 +1390,9 @@ class SearchManager:
             require_keywords = Config.REQUIRE_KEYWORDS
         
         enable_filter = Config.ENABLE_SMART_FILTER and (exclude_keywords or require_keywords)
+        # 每次搜索只编译一次，所有论文共用
+        exclude_re = self._compile_keywords(exclude_keywords)
+        require_re = self._compile_keywords(require_keywords)
         
         if enable_filter:
             print(f"\n🎯 智能过滤已启用:")
@@ -674,24 +1403,63 @@ class SearchManager:
             print()
             
         all_papers = []
+        sources = [source for source in sources if source in self.engine_classes]
+        if not sources:
+            return all_papers
         
-        for source in sources:
-            if source in self.engines:
+        # 各搜索引擎并发执行（均为网络I/O），总耗时取决于最慢的来源
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            futures = {}
+            for source in sources:
                 print(f"正在搜索 {source}...")
-                papers = self.engines[source].search(keywords, start_date, end_date)
+                future = executor.submit(self._search_engine, source, keywords, start_date, end_date)
+                futures[future] = source
+            
+            # 先完成的来源先过滤，单个来源出错不影响其他来源
+            results = {}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    papers = future.result()
+                except Exception as e:
+                    print(f"⚠️ {source} 搜索出错: {str(e)}")
+                    if errors is not None:
+                        errors[source] = str(e)
+                    papers = []
                 
                 # 应用智能过滤
                 if enable_filter:
                     original_count = len(papers)
-                    papers = [p for p in papers if self._filter_paper(p, exclude_keywords, require_keywords)]
+                    papers = [p for p in papers if self._filter_paper(p, exclude_re, require_re)]
                     filtered_count = original_count - len(papers)
                     if filtered_count > 0:
                         print(f"  ✅ 过滤掉 {filtered_count} 篇不相关论文")
                 
-                all_papers.extend(papers)
+                results[source] = papers
                 print(f"从 {source} 找到 {len(papers)} 篇论文")
+        
+        # 按来源顺序合并结果，与完成先后无关
+        for source in sources:
+            all_papers.extend(results[source])
+        
+        # 跨来源去重：同一论文只保留一篇，优先保留元数据更完整的来源
+        positions = {}
+        deduped = []
+        for paper in all_papers:
+            keys = self._dedup_keys(paper)
+            pos = next((positions[key] for key in keys if key in positions), None)
+            if pos is None:
+                pos = len(deduped)
+                deduped.append(paper)
+            elif _source_priority(paper) < _source_priority(deduped[pos]):
+                deduped[pos] = paper
+            for key in keys:
+                positions.setdefault(key, pos)
+        
+        if len(deduped) < len(all_papers):
+            print(f"🔁 去除 {len(all_papers) - len(deduped)} 篇重复论文")
                 
-        return all_papers
+        return deduped
 
 
 # 创建全局搜索管理器实例
@@ -1,41 +1,112 @@
 """搜索历史管理模块"""
-import json
 import os
+import threading
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+import json_utils
+
+
+# 最多保留的搜索记录数
+_MAX_RECORDS = 100
 
 
 class SearchHistory:
-    """搜索历史管理类"""
+    """搜索历史管理类（JSONL追加写入：每次变更只追加一行，加载时同一搜索以最后一行为准）"""
     
     def __init__(self, history_file: str = None):
         """初始化搜索历史管理器"""
         if history_file is None:
             # 保存在项目根目录
             project_root = os.path.dirname(os.path.abspath(__file__))
-            history_file = os.path.join(project_root, 'search_history.json')
+            history_file = os.path.join(project_root, 'search_history.jsonl')
         
         self.history_file = history_file
-        self.history = self._load_history()
+        self.lock = threading.Lock()
+        # (关键词, 排除关键词) -> 记录，与self.history中的记录为同一对象
+        self.index = {}
+        # 文件中的行数，超过记录上限的2倍时压缩重写
+        self.lines = 0
+        # 历史每次变化时加1，常用关键词的缓存结果按版本失效
+        self.version = 0
+        self.popular_cache = {}
+        json_file = os.path.splitext(history_file)[0] + '.json'
+        if not os.path.exists(history_file) and os.path.exists(json_file):
+            self.history = self._migrate_json_history(json_file)
+        else:
+            self.history = self._load_history()
+    
+    @staticmethod
+    def _key(record: Dict) -> Tuple[str, str]:
+        """记录的去重键"""
+        return record.get('keywords'), record.get('exclude_keywords')
     
     def _load_history(self) -> List[Dict]:
         """从文件加载搜索历史"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"加载搜索历史失败: {e}")
-                return []
-        return []
+        if not os.path.exists(self.history_file):
+            return []
+        
+        # 按首次搜索的先后排列，同一记录的后续行只更新内容
+        records = {}
+        try:
+            with open(self.history_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    self.lines += 1
+                    record = json_utils.loads(line)
+                    key = self._key(record)
+                    old = records.get(key)
+                    if old is not None and old.get('first_search_time') == record.get('first_search_time'):
+                        old.update(record)
+                    else:
+                        # 新记录（或被淘汰后重新搜索）排到最后
+                        records.pop(key, None)
+                        records[key] = record
+        except Exception as e:
+            print(f"加载搜索历史失败: {e}")
+        
+        history = list(reversed(records.values()))[:_MAX_RECORDS]
+        self.index = {self._key(record): record for record in history}
+        return history
     
-    def _save_history(self):
-        """保存搜索历史到文件"""
+    def _migrate_json_history(self, json_file: str) -> List[Dict]:
+        """将旧版JSON历史记录导入新文件（仅在JSONL文件不存在时执行一次）"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            with open(json_file, 'rb') as f:
+                self.history = json_utils.loads(f.read())[:_MAX_RECORDS]
         except Exception as e:
-            print(f"保存搜索历史失败: {e}")
+            print(f"导入旧版搜索历史失败: {e}")
+            return []
+        
+        self.index = {self._key(record): record for record in self.history}
+        self._save_history()
+        print(f"已从 {json_file} 导入 {len(self.history)} 条搜索记录")
+        return self.history
+    
+    def _save_history(self):
+        """重写整个文件（删除、清空和压缩时使用）"""
+        with self.lock:
+            try:
+                with open(self.history_file, 'wb') as f:
+                    # 文件按首次搜索的先后排列，最新的记录在最后
+                    f.write(b''.join(json_utils.dumps_bytes(record) + b'\n' for record in reversed(self.history)))
+                self.lines = len(self.history)
+            except Exception as e:
+                print(f"保存搜索历史失败: {e}")
+    
+    def _append_record(self, record: Dict):
+        """追加一条记录的最新内容，文件过长时压缩"""
+        if self.lines >= 2 * _MAX_RECORDS:
+            self._save_history()
+            return
+        with self.lock:
+            try:
+                with open(self.history_file, 'ab') as f:
+                    f.write(json_utils.dumps_bytes(record) + b'\n')
+                self.lines += 1
+            except Exception as e:
+                print(f"保存搜索历史失败: {e}")
     
     def add_search(self, keywords: str, exclude_keywords: str = "", 
                    sources: List[str] = None, results_count: int = 0):
@@ -49,16 +120,16 @@ class SearchHistory:
             results_count: 结果数量
         """
         # 检查是否已存在相同的搜索
-        for record in self.history:
-            if (record.get('keywords') == keywords and 
-                record.get('exclude_keywords') == exclude_keywords):
-                # 更新已存在的记录
-                record['last_search_time'] = datetime.now().isoformat()
-                record['search_count'] = record.get('search_count', 1) + 1
-                record['sources'] = sources or []
-                record['results_count'] = results_count
-                self._save_history()
-                return
+        record = self.index.get((keywords, exclude_keywords))
+        if record is not None:
+            # 更新已存在的记录
+            record['last_search_time'] = datetime.now().isoformat()
+            record['search_count'] = record.get('search_count', 1) + 1
+            record['sources'] = sources or []
+            record['results_count'] = results_count
+            self.version += 1
+            self._append_record(record)
+            return
         
         # 添加新记录
         record = {
@@ -73,11 +144,15 @@ class SearchHistory:
         
         # 添加到列表开头
         self.history.insert(0, record)
+        self.index[(keywords, exclude_keywords)] = record
         
         # 只保留最近100条记录
-        self.history = self.history[:100]
+        for removed in self.history[_MAX_RECORDS:]:
+            self.index.pop(self._key(removed), None)
+        self.history = self.history[:_MAX_RECORDS]
+        self.version += 1
         
-        self._save_history()
+        self._append_record(record)
     
     def get_recent_searches(self, limit: int = 10) -> List[Dict]:
         """
@@ -100,14 +175,50 @@ class SearchHistory:
     def clear_history(self):
         """清空搜索历史"""
         self.history = []
+        self.index = {}
+        self.version += 1
         self._save_history()
     
     def remove_search(self, index: int):
         """删除指定索引的搜索记录"""
         if 0 <= index < len(self.history):
-            self.history.pop(index)
+            record = self.history.pop(index)
+            self.index.pop(self._key(record), None)
+            self.version += 1
             self._save_history()
     
+    def _popular(self, field: str, limit: int) -> List[str]:
+        """
+        按使用次数统计某个字段最常用的取值（结果按历史版本缓存，历史变化后重新计算）
+        
+        Args:
+            field: 记录字段名
+            limit: 返回的数量
+            
+        Returns:
+            取值列表（按使用频率排序）
+        """
+        cache_key = (field, limit, self.version)
+        cached = self.popular_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        freq = Counter()
+        
+        for record in self.history:
+            value = record.get(field, '')
+            if value:
+                freq[value] += record.get('search_count', 1)
+        
+        # most_common只取前limit个，无需对全部取值排序（频率相同时保持出现顺序，与稳定排序一致）
+        result = [value for value, _ in freq.most_common(limit)]
+        
+        # 只保留当前版本的结果
+        if any(key[2] != self.version for key in self.popular_cache):
+            self.popular_cache = {}
+        self.popular_cache[cache_key] = result
+        return result
+    
     def get_popular_keywords(self, limit: int = 5) -> List[str]:
         """
         获取最常用的搜索关键词
@@ -118,17 +229,7 @@ class SearchHistory:
         Returns:
             关键词列表（按使用频率排序）
         """
-        keyword_freq = {}
-        
-        for record in self.history:
-            keywords = record.get('keywords', '')
-            count = record.get('search_count', 1)
-            if keywords:
-                keyword_freq[keywords] = keyword_freq.get(keywords, 0) + count
-        
-        # 按频率排序
-        sorted_keywords = sorted(keyword_freq.items(), key=lambda x: x[1], reverse=True)
-        return [kw for kw, _ in sorted_keywords[:limit]]
+        return self._popular('keywords', limit)
     
     def get_popular_excludes(self, limit: int = 5) -> List[str]:
         """
@@ -140,17 +241,7 @@ class SearchHistory:
         Returns:
             排除关键词列表（按使用频率排序）
         """
-        exclude_freq = {}
-        
-        for record in self.history:
-            excludes = record.get('exclude_keywords', '')
-            count = record.get('search_count', 1)
-            if excludes:
-                exclude_freq[excludes] = exclude_freq.get(excludes, 0) + count
-        
-        # 按频率排序
-        sorted_excludes = sorted(exclude_freq.items(), key=lambda x: x[1], reverse=True)
-        return [ex for ex, _ in sorted_excludes[:limit]]
+        return self._popular('exclude_keywords', limit)
 
 
 # 创建全局搜索历史管理器实例
@@ -0,0 +1,101 @@
+"""翻译缓存模块"""
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+class TranslationCache:
+    """翻译结果持久化缓存，以原文的SHA1为键保存在SQLite中"""
+    
+    def __init__(self, cache_file: str = None):
+        """
+        初始化翻译缓存
+        
+        Args:
+            cache_file: 缓存数据库文件路径
+        """
+        if cache_file is None:
+            # 默认保存在项目根目录
+            project_root = os.path.dirname(os.path.abspath(__file__))
+            cache_file = os.path.join(project_root, 'translations.sqlite')
+        
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.conn = None
+        # 启动时一次性载入内存，查询为O(1)字典访问
+        self.cache = self._load_cache()
+    
+    def _load_cache(self) -> Dict[str, str]:
+        """打开数据库并加载全部翻译"""
+        try:
+            self.conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations (hash TEXT PRIMARY KEY, translation TEXT)'
+            )
+            self.conn.commit()
+            return dict(self.conn.execute('SELECT hash, translation FROM translations'))
+        except Exception as e:
+            print(f"加载翻译缓存失败: {e}")
+            return {}
+    
+    @staticmethod
+    def _hash(text: str) -> str:
+        """计算原文的缓存键"""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def get(self, text: str) -> Optional[str]:
+        """
+        查询缓存的翻译
+        
+        Args:
+            text: 原文
+        
+        Returns:
+            翻译结果，未命中返回None
+        """
+        if not text:
+            return None
+        return self.cache.get(self._hash(text))
+    
+    def set(self, text: str, translation: Optional[str]):
+        """
+        写入翻译结果（空结果和失败结果不缓存）
+        
+        Args:
+            text: 原文
+            translation: 翻译结果
+        """
+        if not text or not translation:
+            return
+        
+        key = self._hash(text)
+        with self.lock:
+            self.cache[key] = translation
+            if self.conn is None:
+                return
+            try:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO translations (hash, translation) VALUES (?, ?)',
+                    (key, translation)
+                )
+                self.conn.commit()
+            except Exception as e:
+                print(f"保存翻译缓存失败: {e}")
+    
+    def clear(self):
+        """清空翻译缓存"""
+        with self.lock:
+            self.cache = {}
+            if self.conn is None:
+                return
+            try:
+                self.conn.execute('DELETE FROM translations')
+                self.conn.commit()
+            except Exception as e:
+                print(f"清空翻译缓存失败: {e}")
+
+
+# 创建全局翻译缓存实例
+translation_cache = TranslationCache()